@@ -1,5 +1,8 @@
+import os
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from time import time
+from typing import Iterator
 
 
 def timer_func(func):
@@ -13,42 +16,132 @@ def timer_func(func):
     return wrap_func
 
 
-@timer_func
-def part_1() -> int:
+def count_increases(depths: np.ndarray, windows: list[int]) -> dict[int, int]:
     """
-    :return: total number of increases
+    :param depths: depth measurements
+    :param windows: sizes of the running sums, 1 for part 1 and 3 for part 2
+    :return: total number of increases over the running sum for every window size
     """
 
-    # PART 1
-    with open("puzzle_input.txt", "r") as f:
-        puzzle_input = [int(i) for i in f.read().splitlines()]
+    # two neighbouring running sums share all but one measurement, so comparing them
+    # is the same as comparing depth[i + window] with depth[i]
+    return {window: int(np.count_nonzero(depths[window:] > depths[:-window])) for window in windows}
 
-    # calculating the number of increases as difference between two vectors
-    v_1 = np.array(puzzle_input)
-    v_2 = v_1[1:]
-    v_2 = np.append(v_2, 0)
-    v_diff = v_2-v_1
-    number_of_increase = [1 if i > 0 else 0 for i in v_diff]
-    return sum(number_of_increase)
 
+def read_depths_chunked(puzzle_file: str, chunk_size: int = 2**20) -> Iterator[np.ndarray]:
+    """
+    :param puzzle_file: file with one depth measurement per line
+    :param chunk_size: number of bytes read from the file at once
+    :return: generator of depth arrays, one per chunk, each holding only complete lines
+    """
+    remainder = b""
+    with open(puzzle_file, "rb") as f:
+        while chunk := f.read(chunk_size):
+            chunk = remainder + chunk
+            # a line cut in half by the chunk border is kept for the next chunk
+            cut = chunk.rfind(b"\n") + 1
+            remainder = chunk[cut:]
+            if cut:
+                yield np.array(chunk[:cut].split(), dtype=np.int64)
+    if remainder.strip():
+        yield np.array(remainder.split(), dtype=np.int64)
 
-def part_2() -> int:
+
+def count_increases_streaming(puzzle_file: str, windows: list[int], chunk_size: int = 2**20) -> dict[int, int]:
     """
-    :return: total number of increases over the running sum
+    :param puzzle_file: file with one depth measurement per line
+    :param windows: sizes of the running sums, 1 for part 1 and 3 for part 2
+    :param chunk_size: number of bytes read from the file at once
+    :return: total number of increases over the running sum for every window size
     """
+    carry = np.empty(0, dtype=np.int64)
+    number_of_increase = dict.fromkeys(windows, 0)
+    for depths in read_depths_chunked(puzzle_file, chunk_size):
+        v = np.concatenate((carry, depths))
+        # pairs lying completely inside the carried measurements were counted with the previous chunk
+        counted = count_increases(carry, windows)
+        for window, increases in count_increases(v, windows).items():
+            number_of_increase[window] += increases - counted[window]
+        carry = v[-max(windows):]  # the last measurements are still needed for the next chunk
 
-    with open("puzzle_input.txt", "r") as f:
-        puzzle_input = [int(i) for i in f.read().splitlines()]
+    return number_of_increase
 
-    # a running sum can be calculated using convolution
-    v_1 = np.array(puzzle_input)
-    v_1_rs = np.convolve(v_1, np.ones(3), mode='valid')
-    v_2_rs = v_1_rs[1:]
-    v_2_rs = np.append(v_2_rs, 0)
-    vrs_diff = v_2_rs - v_1_rs
-    number_of_increase_rs = [1 if i > 0 else 0 for i in vrs_diff]
 
-    return sum(number_of_increase_rs)
+def split_on_lines(puzzle_file: str, no_chunks: int) -> list[tuple[int, int]]:
+    """
+    :param puzzle_file: file with one depth measurement per line
+    :param no_chunks: number of byte ranges the file should be split into
+    :return: list of (start, end) byte offsets, every range starting at the beginning of a line
+    """
+    size = os.path.getsize(puzzle_file)
+    boundaries = [0]
+    with open(puzzle_file, "rb") as f:
+        for i in range(1, no_chunks):
+            # move the border forward to the start of the next line
+            f.seek(max(i * size // no_chunks - 1, boundaries[-1]))
+            f.readline()
+            if boundaries[-1] < f.tell() < size:
+                boundaries.append(f.tell())
+    boundaries.append(size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def _count_increases_in_range(puzzle_file: str, start: int, end: int,
+                              windows: list[int]) -> tuple[dict[int, int], np.ndarray, np.ndarray]:
+    """
+    :return: increases inside the byte range together with its first and last measurements,
+     which are needed to count the increases across the range borders
+    """
+    with open(puzzle_file, "rb") as f:
+        f.seek(start)
+        depths = np.array(f.read(end - start).split(), dtype=np.int64)
+    overlap = max(windows)
+    return count_increases(depths, windows), depths[:overlap], depths[-overlap:]
+
+
+def count_increases_parallel(puzzle_file: str, windows: list[int], processes: int | None = None,
+                             no_chunks: int | None = None) -> dict[int, int]:
+    """
+    :param puzzle_file: file with one depth measurement per line
+    :param windows: sizes of the running sums, 1 for part 1 and 3 for part 2
+    :param processes: number of worker processes, defaults to the number of cores
+    :param no_chunks: number of byte ranges the file is split into, defaults to four per process
+    :return: total number of increases over the running sum for every window size
+    """
+    processes = processes or os.cpu_count()
+    ranges = split_on_lines(puzzle_file, no_chunks or 4 * processes)
+
+    carry = np.empty(0, dtype=np.int64)
+    number_of_increase = dict.fromkeys(windows, 0)
+    with ProcessPoolExecutor(processes) as executor:
+        results = executor.map(_count_increases_in_range, [puzzle_file] * len(ranges),
+                               *zip(*ranges), [windows] * len(ranges))
+        for increases, head, tail in results:
+            # increases whose pair of measurements lies on both sides of the range border
+            seam = count_increases(np.concatenate((carry, head)), windows)
+            counted_carry = count_increases(carry, windows)
+            counted_head = count_increases(head, windows)
+            for window in windows:
+                number_of_increase[window] += increases[window] + seam[window] \
+                    - counted_carry[window] - counted_head[window]
+            carry = np.concatenate((carry, tail))[-max(windows):]
+
+    return number_of_increase
+
+
+@timer_func
+def part_1() -> int:
+    """
+    :return: total number of increases
+    """
+    return count_increases_streaming("puzzle_input.txt", [1])[1]
+
+
+def part_2() -> int:
+    """
+    :return: total number of increases over the running sum
+    """
+    return count_increases_streaming("puzzle_input.txt", [3])[3]
 
 
 if __name__ == '__main__':
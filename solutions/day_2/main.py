@@ -1,6 +1,12 @@
+import os
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from time import time
 
+FORWARD, DOWN, UP = 0, 1, 2
+DIRECTIONS = {"forward": FORWARD, "down": DOWN, "up": UP}
+
 
 def timer_func(func):
     def wrap_func(*args, **kwargs):
@@ -13,53 +19,200 @@ def timer_func(func):
     return wrap_func
 
 
-@timer_func
-def part_1() -> int:
+def parse_commands(commands: str) -> (np.ndarray, np.ndarray):
     """
-    :return:   product of coordinates
+    :param commands: dive commands, one "direction amount" pair per line
+    :return: array of opcodes (FORWARD, DOWN, UP, -1 for unknown directions) and array of amounts
     """
+    words = commands.split()
+    directions = np.array(words[0::2])
+    amounts = np.array(words[1::2], dtype=np.int64)
 
-    with open("puzzle_input.txt", "r") as f:
-        puzzle_input = f.read().splitlines()
+    opcodes = np.full(len(directions), -1, dtype=np.int8)
+    for direction, opcode in DIRECTIONS.items():
+        opcodes[directions == direction] = opcode
+    if np.any(opcodes == -1):
+        print("unknown direction")
 
-    pos = np.array([0, 0])
+    return opcodes, amounts
 
-    for i in puzzle_input:
-        if i[0] == "f":
-            pos = pos + np.array([int(i[-1]), 0])
-        elif i[0] == "d":
-            pos = pos + np.array([0, int(i[-1])])
-        elif i[0] == "u":
-            pos = pos - np.array([0, int(i[-1])])
-        else:
-            print("unknown direction")
 
-    return np.product(pos)
+def read_commands(puzzle_file: str) -> (np.ndarray, np.ndarray):
+    with open(puzzle_file, "r") as f:
+        return parse_commands(f.read())
 
 
-@timer_func
-def part_2() -> int:
+def _exact_amounts(amounts: np.ndarray) -> np.ndarray:
     """
-    :return:   product of coordinates
+    :param amounts: amounts of the commands
+    :return: the amounts, as exact Python integers when summing them could overflow int64
+    """
+    if int(np.abs(amounts).max(initial=0)) * len(amounts) >= 2**62:
+        return amounts.astype(object)
+    return amounts
+
+
+def course_without_aim(opcodes: np.ndarray, amounts: np.ndarray) -> (int, int):
+    """
+    :return: horizontal position and depth when down and up change the depth directly
+    """
+    amounts = _exact_amounts(amounts)
+    horizontal = amounts[opcodes == FORWARD].sum()
+    depth = amounts[opcodes == DOWN].sum() - amounts[opcodes == UP].sum()
+    return int(horizontal), int(depth)
+
+
+def course_with_aim(opcodes: np.ndarray, amounts: np.ndarray) -> (int, int):
+    """
+    :return: horizontal position and depth when down and up change the aim
+    """
+    amounts = _exact_amounts(amounts)
+    steering = np.where(opcodes == DOWN, amounts, 0) - np.where(opcodes == UP, amounts, 0)
+    forward = opcodes == FORWARD
+    # fall back to exact Python integers where aim * forward could overflow int64
+    if amounts.dtype != object and \
+            int(np.abs(steering).sum()) * int(np.abs(amounts[forward]).sum()) >= 2**62:
+        amounts, steering = amounts.astype(object), steering.astype(object)
+
+    # the aim at every command is the running sum of all down and up commands before it
+    aim = np.cumsum(steering)
+    horizontal = amounts[forward].sum()
+    depth = (aim[forward] * amounts[forward]).sum()
+    return int(horizontal), int(depth)
+
+
+def block_course(opcodes: np.ndarray, amounts: np.ndarray) -> (int, int, int):
+    """
+    :return: (horizontal, depth, aim) reached by the commands when starting from (0, 0, 0)
+    """
+    horizontal, depth = course_with_aim(opcodes, amounts)
+    amounts = _exact_amounts(amounts)
+    aim = int(amounts[opcodes == DOWN].sum() - amounts[opcodes == UP].sum())
+    return horizontal, depth, aim
+
+
+def compose_courses(first: (int, int, int), second: (int, int, int)) -> (int, int, int):
+    """
+    :param first: (horizontal, depth, aim) reached by a block of commands starting from (0, 0, 0)
+    :param second: (horizontal, depth, aim) reached by the following block starting from (0, 0, 0)
+    :return: (horizontal, depth, aim) reached by both blocks one after the other
+    """
+    # the aim left over from the first block adds aim * forward to every forward of the second
+    return first[0] + second[0], first[1] + second[1] + first[2] * second[0], first[2] + second[2]
+
+
+def split_on_lines(puzzle_file: str, no_chunks: int) -> list[tuple[int, int]]:
     """
+    :param puzzle_file: file with one command per line
+    :param no_chunks: number of byte ranges the file should be split into
+    :return: list of (start, end) byte offsets, every range starting at the beginning of a line
+    """
+    size = os.path.getsize(puzzle_file)
+    boundaries = [0]
+    with open(puzzle_file, "rb") as f:
+        for i in range(1, no_chunks):
+            # move the border forward to the start of the next line
+            f.seek(max(i * size // no_chunks - 1, boundaries[-1]))
+            f.readline()
+            if boundaries[-1] < f.tell() < size:
+                boundaries.append(f.tell())
+    boundaries.append(size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def _course_in_range(puzzle_file: str, start: int, end: int) -> (int, (int, int, int)):
+    """
+    :return: number of commands in the byte range and the (horizontal, depth, aim) they reach from (0, 0, 0)
+    """
+    with open(puzzle_file, "rb") as f:
+        f.seek(start)
+        opcodes, amounts = parse_commands(f.read(end - start).decode())
+    return len(opcodes), block_course(opcodes, amounts)
+
+
+def course_parallel(puzzle_file: str, processes: int | None = None,
+                    no_chunks: int | None = None) -> list[tuple[int, int, int, int]]:
+    """
+    :param puzzle_file: file with one command per line
+    :param processes: number of worker processes, defaults to the number of cores
+    :param no_chunks: number of byte ranges the file is split into, defaults to four per process
+    :return: list of checkpoints (number of commands, horizontal, depth, aim), one after every byte range,
+     the last one being the final position
+    """
+    processes = processes or os.cpu_count()
+    ranges = split_on_lines(puzzle_file, no_chunks or 4 * processes)
 
-    with open("puzzle_input.txt", "r") as f:
-        puzzle_input = f.read().splitlines()
+    no_commands, course = 0, (0, 0, 0)
+    checkpoints = []
+    with ProcessPoolExecutor(processes) as executor:
+        for no_range_commands, range_course in executor.map(_course_in_range, [puzzle_file] * len(ranges),
+                                                            *zip(*ranges)):
+            no_commands += no_range_commands
+            course = compose_courses(course, range_course)
+            checkpoints.append((no_commands, *course))
 
-    pos = np.array([0, 0])
-    aim = 0
+    return checkpoints
 
-    for i in puzzle_input:
-        if i[0] == "f":
-            pos = pos + np.array([int(i[-1]), aim * int(i[-1])])
-        elif i[0] == "d":
-            aim += int(i[-1])
-        elif i[0] == "u":
-            aim -= int(i[-1])
+
+@dataclass
+class SubmarineTracker:
+    """
+    Position of the submarine, updated with every command from a live feed
+    """
+    horizontal: int = 0
+    depth: int = 0
+    aim: int = 0
+
+    def push(self, command: str):
+        direction, amount = command.split()
+        amount = int(amount)
+        if direction == "forward":
+            self.horizontal += amount
+            self.depth += self.aim * amount
+        elif direction == "down":
+            self.aim += amount
+        elif direction == "up":
+            self.aim -= amount
         else:
             print("unknown direction")
 
-    return np.product(pos)
+    def push_many(self, commands: str | list[str]):
+        if not isinstance(commands, str):
+            commands = "\n".join(commands)
+        block = block_course(*parse_commands(commands))
+        self.horizontal, self.depth, self.aim = compose_courses((self.horizontal, self.depth, self.aim), block)
+
+    @property
+    def product_without_aim(self) -> int:
+        """
+        :return: product of coordinates as in part 1, where the depth follows the aim
+        """
+        return self.horizontal * self.aim
+
+    @property
+    def product(self) -> int:
+        """
+        :return: product of coordinates as in part 2
+        """
+        return self.horizontal * self.depth
+
+
+@timer_func
+def part_1() -> int:
+    """
+    :return:   product of coordinates
+    """
+    horizontal, depth = course_without_aim(*read_commands("puzzle_input.txt"))
+    return horizontal * depth
+
+
+@timer_func
+def part_2() -> int:
+    """
+    :return:   product of coordinates
+    """
+    horizontal, depth = course_with_aim(*read_commands("puzzle_input.txt"))
+    return horizontal * depth
 
 
 if __name__ == '__main__':
@@ -1,6 +1,5 @@
 import numpy as np
 from time import time
-from itertools import chain
 
 
 def timer_func(func):
@@ -14,66 +13,205 @@ def timer_func(func):
     return wrap_func
 
 
-@timer_func
-def part_1() -> int:
+def parse_report(report: str) -> (np.ndarray, int):
     """
-    :return:   product of gamma and epsilon rates
+    :param report: diagnostic report, one binary number per line of at most 64 bits
+    :return: array of the binary numbers as unsigned integers and the number of bits per row
+    """
+    rows = report.split()
+    width = len(rows[0])
+    if width > 64:
+        raise ValueError(f"rows of {width} bits do not fit into 64-bit integers, use a DiagnosticIndex instead")
+    bits = (np.frombuffer("".join(rows).encode(), dtype=np.uint8) - ord("0")).reshape(-1, width)
+
+    # shift the columns in one at a time, most significant bit first
+    values = np.zeros(len(rows), dtype=np.uint64)
+    for column in bits.T:
+        values <<= 1
+        values |= column
+    return values, width
+
+
+def read_report(puzzle_file: str) -> (np.ndarray, int):
+    with open(puzzle_file, "r") as f:
+        return parse_report(f.read())
+
+
+def column_counts(values: np.ndarray, width: int) -> np.ndarray:
     """
+    :return: number of ones in every bit column, most significant bit first
+    """
+    # histogram every byte of the numbers and look up which bits each byte value has set
+    lanes = values.astype("<u8", copy=False).view(np.uint8).reshape(-1, 8)
+    bits_of_byte = (np.arange(256)[:, None] >> np.arange(8)) & 1
+    ones = np.concatenate([np.bincount(lanes[:, lane], minlength=256) @ bits_of_byte
+                           for lane in range((width + 7) // 8)])
+    return ones[width - 1::-1]
 
-    with open("puzzle_input.txt", "r") as f:
-        puzzle_input = np.fromiter(chain(*f.read().splitlines()), int)
 
-    length = len(puzzle_input)/12
-    x = [sum(puzzle_input[i::12])/length for i in range(12)]
+def gamma_epsilon_rates(values: np.ndarray, width: int) -> (int, int):
+    """
+    :return: gamma rate (most common bits) and epsilon rate (least common bits)
+    """
+    return rates_from_column_counts(column_counts(values, width), len(values))
 
-    gamma_rate = [1 if i < 0.5 else 0 for i in x]
-    gamma_rate = int(''.join([str(i) for i in gamma_rate]), 2)  # converting from binary to decimal
 
-    epsilon_rate = [1 if i > 0.5 else 0 for i in x]
-    epsilon_rate = int(''.join([str(i) for i in epsilon_rate]), 2)  # converting from binary to decimal
+def rates_from_column_counts(ones: list[int], no_rows: int) -> (int, int):
+    """
+    :param ones: number of ones in every bit column, most significant bit first
+    :param no_rows: number of rows in the report
+    :return: gamma rate (most common bits) and epsilon rate (least common bits)
+    """
+    gamma_rate = epsilon_rate = 0
+    for one in ones:
+        zero = no_rows - one
+        gamma_rate = (gamma_rate << 1) | int(one > zero)
+        epsilon_rate = (epsilon_rate << 1) | int(one < zero)
+
+    return gamma_rate, epsilon_rate
 
-    return epsilon_rate * gamma_rate
 
 @timer_func
-def part_2() -> int:
+def part_1() -> int:
     """
-    :return:   product of oxygen and CO2 rating
+    :return:   product of gamma and epsilon rates
     """
+    gamma_rate, epsilon_rate = gamma_epsilon_rates(*read_report("puzzle_input.txt"))
+    return gamma_rate * epsilon_rate
 
-    with open("puzzle_input.txt", "r") as f:
-        puzzle_input_str = f.read().splitlines()
 
-    filtered = puzzle_input_str
+def life_support_rating(sorted_values: np.ndarray, width: int, most_common: bool) -> int:
+    """
+    :param sorted_values: diagnostic report as sorted unsigned integers
+    :param width: number of bits per row
+    :param most_common: True for the oxygen generator rating, False for the CO2 scrubber rating
+    :return: the rating
+    """
 
-    # Oxygen
-    for i in range(12):
-        x_len = len(filtered)
-        if x_len == 1:
+    # all rows sharing the bits seen so far form the contiguous range [lo, hi) of the sorted report,
+    # inside which the rows with the next bit set come after the rows with it unset
+    lo, hi = 0, len(sorted_values)
+    prefix = 0
+    for shift in range(width - 1, -1, -1):
+        if hi - lo == 1:
             break
-        filtered_int = np.fromiter(chain(*filtered), int)
-        x = sum(filtered_int[i::12])/x_len
-        if x >= 0.5:
-            filtered = list(filter(lambda y: int(y[i]) == 1, filtered))
+        split = lo + int(np.searchsorted(sorted_values[lo:hi], np.uint64(prefix | 1 << shift)))
+        ones, zeros = hi - split, split - lo
+        # when all rows share the bit, they are kept whichever value is requested
+        if zeros == 0 or (ones and (ones >= zeros) == most_common):
+            lo = split
+            prefix |= 1 << shift
         else:
-            filtered = list(filter(lambda y: int(y[i]) == 0, filtered))
+            hi = split
 
-    oxy = int(filtered[0], 2)
+    return int(sorted_values[lo])
+
+
+def life_support_ratings(values: np.ndarray, width: int) -> (int, int):
+    """
+    :return: oxygen generator rating and CO2 scrubber rating
+    """
+    sorted_values = np.sort(values)
+    return life_support_rating(sorted_values, width, True), life_support_rating(sorted_values, width, False)
 
-    # CO2
-    filtered = puzzle_input_str
-    for i in range(12):
-        x_len = len(filtered)
-        if x_len == 1:
-            break
-        filtered_int = np.fromiter(chain(*filtered), int)
-        x = sum(filtered_int[i::12])/x_len
-        if x >= 0.5:
-            filtered = list(filter(lambda y: int(y[i]) == 0, filtered))
-        else:
-            filtered = list(filter(lambda y: int(y[i]) == 1, filtered))
 
-    co2 = int(filtered[0], 2)
+class DiagnosticIndex:
+    """
+    Binary trie over the rows of a diagnostic report, every node holding the number of rows below it.
+    Rows can be inserted and removed while the rates and ratings are answered in O(width).
+    """
+
+    def __init__(self, width: int):
+        self.width = width
+        self._children = [[0, 0]]  # node 0 is the root, so 0 also marks a missing child
+        self._counts = [0]
+        self._ones = [0] * width  # number of ones in every bit column, most significant bit first
+
+    def __len__(self) -> int:
+        return self._counts[0]
+
+    def _bits(self, row: int | str):
+        if isinstance(row, str):
+            if len(row) != self.width:
+                raise ValueError(f"row {row} does not have {self.width} bits")
+            row = int(row, 2)
+        row = int(row)
+        if row >> self.width:
+            raise ValueError(f"row {row} does not fit into {self.width} bits")
+        return [(row >> shift) & 1 for shift in range(self.width - 1, -1, -1)]
+
+    def insert(self, row: int | str, count: int = 1):
+        bits = self._bits(row)
+        node = 0
+        self._counts[node] += count
+        for column, bit in enumerate(bits):
+            if not self._children[node][bit]:
+                self._children[node][bit] = len(self._counts)
+                self._children.append([0, 0])
+                self._counts.append(0)
+            node = self._children[node][bit]
+            self._counts[node] += count
+            self._ones[column] += bit * count
+
+    def insert_many(self, rows: np.ndarray | list):
+        for row in rows:
+            self.insert(row)
+
+    def remove(self, row: int | str, count: int = 1):
+        bits = self._bits(row)
+
+        # find the path first, so a missing row leaves the index untouched
+        path = [0]
+        for bit in bits:
+            path.append(self._children[path[-1]][bit])
+            if not path[-1] or self._counts[path[-1]] < count:
+                raise KeyError(f"row {row} is not in the index {count} time(s)")
+
+        for node in path:
+            self._counts[node] -= count
+        for column, bit in enumerate(bits):
+            self._ones[column] -= bit * count
+
+    def gamma_epsilon_rates(self) -> (int, int):
+        """
+        :return: gamma rate (most common bits) and epsilon rate (least common bits)
+        """
+        return rates_from_column_counts(self._ones, len(self))
+
+    def life_support_rating(self, most_common: bool) -> int:
+        """
+        :param most_common: True for the oxygen generator rating, False for the CO2 scrubber rating
+        :return: the rating
+        """
+        if not len(self):
+            raise ValueError("the diagnostic index is empty")
+
+        node = 0
+        rating = 0
+        for _ in range(self.width):
+            zero_child, one_child = self._children[node]
+            zeros = self._counts[zero_child] if zero_child else 0
+            ones = self._counts[one_child] if one_child else 0
+            # when all rows share the bit, they are kept whichever value is requested
+            bit = int(zeros == 0 or (ones > 0 and (ones >= zeros) == most_common))
+            node = self._children[node][bit]
+            rating = (rating << 1) | bit
+
+        return rating
+
+    def life_support_ratings(self) -> (int, int):
+        """
+        :return: oxygen generator rating and CO2 scrubber rating
+        """
+        return self.life_support_rating(True), self.life_support_rating(False)
 
+
+@timer_func
+def part_2() -> int:
+    """
+    :return:   product of oxygen and CO2 rating
+    """
+    oxy, co2 = life_support_ratings(*read_report("puzzle_input.txt"))
     return oxy * co2
 
 
@@ -1,9 +1,15 @@
 from time import time
+from itertools import islice
+from typing import Iterator
 import logging
 import numpy as np
 
 logging.basicConfig(filename='bingo.log', filemode='w', level=logging.DEBUG)
 
+# bit 5 * row + column stands for a cell, a card wins once all bits of a row or column mask are marked
+WIN_MASKS = np.array([0b11111 << 5 * row for row in range(5)]
+                     + [0b0000100001000010000100001 << column for column in range(5)], dtype=np.uint32)
+
 
 def timer_func(func):
     def wrap_func(*args, **kwargs):
@@ -16,125 +22,163 @@ def timer_func(func):
     return wrap_func
 
 
+def read_bingo(puzzle_file: str) -> (np.ndarray, np.ndarray):
+    """
+    :param puzzle_file: drawn numbers on the first line, followed by 5x5 bingo cards
+    :return: array of drawn numbers and array of all bingo cards with shape (no. of cards, 5, 5)
+    """
+    with open(puzzle_file, "r") as f:
+        numbers_drawn = np.array(f.readline().split(','), dtype=np.int64)
+        bingo_cards_all = np.array(f.read().split(), dtype=np.int64).reshape(-1, 5, 5)
+    logging.info(f"Loaded {len(numbers_drawn)} drawn numbers and {len(bingo_cards_all)} bingo cards")
+    return numbers_drawn, bingo_cards_all
+
+
+def play_bingo(numbers_drawn: np.ndarray, bingo_cards_all: np.ndarray) -> (np.ndarray, np.ndarray, np.ndarray):
+    """
+    :param numbers_drawn: drawn numbers in order
+    :param bingo_cards_all: bingo cards with shape (no. of cards, 5, 5)
+    :return: order in which the cards win (cards that never win are left out), the index of the draw
+     that makes every card win (len(numbers_drawn) for cards that never win) and the score of every card
+    """
+    no_draws = len(numbers_drawn)
+
+    # replace every number on the cards by the index of the draw that marks it
+    draw_index = np.full(int(max(numbers_drawn.max(), bingo_cards_all.max())) + 1, no_draws)
+    draw_index[numbers_drawn[::-1]] = np.arange(no_draws)[::-1]  # a repeated number counts on its first draw
+    marked_at = draw_index[bingo_cards_all]
+
+    # a row or column is complete at its latest draw, a card wins with its earliest complete row or column
+    win_turns = np.minimum(marked_at.max(axis=2).min(axis=1), marked_at.max(axis=1).min(axis=1))
+
+    unmarked = np.where(marked_at > win_turns[:, None, None], bingo_cards_all, 0).sum(axis=(1, 2), dtype=np.int64)
+    winning_number = numbers_drawn[np.minimum(win_turns, no_draws - 1)]
+    scores = np.where(win_turns < no_draws, unmarked * winning_number, 0)
+
+    win_order = np.argsort(win_turns, kind="stable")
+    win_order = win_order[win_turns[win_order] < no_draws]
+
+    return win_order, win_turns, scores
+
+
+def read_bingo_chunked(puzzle_file: str, chunk_cards: int = 2**16) -> Iterator[np.ndarray]:
+    """
+    :param puzzle_file: drawn numbers on the first line, followed by 5x5 bingo cards
+    :param chunk_cards: number of bingo cards per chunk
+    :return: generator of arrays with shape (no. of cards, 5, 5) in the smallest integer type holding the numbers
+    """
+    with open(puzzle_file, "r") as f:
+        f.readline()  # drawn numbers
+        remainder = np.empty(0, dtype=np.int64)
+        while lines := list(islice(f, 6 * chunk_cards)):
+            numbers = np.concatenate((remainder, np.array(" ".join(lines).split(), dtype=np.int64)))
+            # numbers of a card cut in half by the chunk border are kept for the next chunk
+            no_numbers = len(numbers) - len(numbers) % 25
+            remainder = numbers[no_numbers:]
+            if no_numbers:
+                cards = numbers[:no_numbers].reshape(-1, 5, 5)
+                yield cards.astype(np.result_type(np.min_scalar_type(cards.min()), np.min_scalar_type(cards.max())))
+
+
+def rank_bingo_cards(puzzle_file: str, k: int, chunk_cards: int = 2**16) -> (list, list):
+    """
+    :param puzzle_file: drawn numbers on the first line, followed by 5x5 bingo cards
+    :param k: number of cards to return from each end of the win order
+    :param chunk_cards: number of bingo cards loaded at once
+    :return: (card, index of the winning draw, score) of the k earliest and of the k latest winning cards,
+     cards winning on the same draw are ordered by their position in the file
+    """
+    with open(puzzle_file, "r") as f:
+        numbers_drawn = np.array(f.readline().split(','), dtype=np.int64)
+
+    empty = np.empty(0, dtype=np.int64)
+    earliest = latest = (empty, empty, empty)
+    first_card = 0
+    for bingo_cards in read_bingo_chunked(puzzle_file, chunk_cards):
+        win_order, win_turns, scores = play_bingo(numbers_drawn, bingo_cards)
+        chunk = (win_order + first_card, win_turns[win_order], scores[win_order])
+        first_card += len(bingo_cards)
+
+        # keep only the k best candidates of the cards seen so far
+        cards, turns, chunk_scores = (np.concatenate(i) for i in zip(earliest, chunk))
+        best = np.lexsort((cards, turns))[:k]
+        earliest = (cards[best], turns[best], chunk_scores[best])
+        cards, turns, chunk_scores = (np.concatenate(i) for i in zip(latest, chunk))
+        best = np.lexsort((cards, -turns))[:k]
+        latest = (cards[best], turns[best], chunk_scores[best])
+
+    logging.info(f"Ranked {first_card} bingo cards")
+    return [tuple(map(int, i)) for i in zip(*earliest)], [tuple(map(int, i)) for i in zip(*latest)]
+
+
+class BingoServer:
+    """
+    Live bingo game, numbers are drawn one at a time and cards are reported the moment they win
+    """
+
+    def __init__(self, bingo_cards_all: np.ndarray):
+        """
+        :param bingo_cards_all: bingo cards with shape (no. of cards, 5, 5)
+        """
+        no_cards = len(bingo_cards_all)
+        self.marks = np.zeros(no_cards, dtype=np.uint32)
+        self.unmarked = bingo_cards_all.reshape(no_cards, 25).sum(axis=1)
+        self.won = np.zeros(no_cards, dtype=bool)
+        self.winners = []  # (card, winning number, score) in the order the cards won
+
+        # inverted index: the cells holding a number are a contiguous block of the sorted cell list
+        numbers = bingo_cards_all.ravel()
+        self._cells = np.argsort(numbers, kind="stable")
+        self._numbers = numbers[self._cells]
+
+    def draw(self, number: int) -> list[tuple[int, int]]:
+        """
+        :param number: drawn number
+        :return: (card, score) of every card winning with this number
+        """
+        lo, hi = np.searchsorted(self._numbers, [number, number + 1])
+        cards, cells = np.divmod(self._cells[lo:hi], 25)
+
+        # cards that have already won are no longer played, cells already marked by a repeated draw are skipped
+        bits = np.left_shift(1, cells).astype(np.uint32)
+        playing = ~self.won[cards] & (self.marks[cards] & bits == 0)
+        cards, bits = cards[playing], bits[playing]
+        np.bitwise_or.at(self.marks, cards, bits)
+        np.subtract.at(self.unmarked, cards, number)
+
+        touched = np.unique(cards)
+        complete = ((self.marks[touched, None] & WIN_MASKS) == WIN_MASKS).any(axis=1)
+        new_winners = touched[complete]
+        self.won[new_winners] = True
+
+        scores = self.unmarked[new_winners] * number
+        winners = list(zip(new_winners.tolist(), scores.tolist()))
+        self.winners.extend((card, number, score) for card, score in winners)
+        if winners:
+            logging.info(f"Number {number} completes card(s) {[card for card, _ in winners]}")
+        return winners
+
+
 @timer_func
 def part_1() -> int:
     """
     :return:   Final score of the winning board
     """
+    win_order, win_turns, scores = play_bingo(*read_bingo("puzzle_input.txt"))
+    return int(scores[win_order[0]])
 
-    with open("puzzle_input.txt", "r") as f:
-        puzzle_input = f.read().splitlines()
-
-    # reading generated numbers
-    numbers_drawn = list(map(int, puzzle_input[0].split(',')))
-
-    # reading bingo cards
-    bingo_cards_all = []
-    for i in range(2, len(puzzle_input)+1, 6):
-        bingo_card = []
-        for row in puzzle_input[i:i+5]:
-            row = list(filter(None, row.split(' ')))  # delete empty strings
-            bingo_card.append(list(row))
-        bingo_cards_all.append(np.asarray(bingo_card, int))
-
-    bingo_card_success_index = []
-    no_of_trials_index = []
-    for no_bingo_card, bingo_card in enumerate(bingo_cards_all):
-        successful_marks = 0
-        for no_of_trials, number in enumerate(numbers_drawn):
-            new_bingo_card = np.where(bingo_card == number, -1, bingo_card)
-
-            # check if bingo_card changed
-            if np.array_equal(new_bingo_card, bingo_card):
-                pass
-            else:
-                successful_marks += 1
-                bingo_card = new_bingo_card
-                indices = np.asarray(new_bingo_card == -1).nonzero()
-
-                # check if there are 5 or more marks
-                if len(indices[0]) > 4:
-                    una_1 = np.unique(indices[0], return_counts=True)
-                    una_2 = np.unique(indices[1], return_counts=True)
-
-                    # check if there are 5 marks in a row in the vertical or horizontal direction
-                    if (
-                                (not np.where(una_1[1] == 5)[0].tolist() == []) or
-                                (not np.where(una_2[1] == 5)[0].tolist() == [])
-                    ):
-
-                        # record successful bingo
-                        no_of_trials_index.append(no_of_trials)
-                        bingo_card_success_index.append((successful_marks, number))
-                        bingo_cards_all[no_bingo_card] = new_bingo_card
-                        break
-
-    winner_index = no_of_trials_index.index(min(no_of_trials_index))
-    score = (np.sum(bingo_cards_all[winner_index])
-             + bingo_card_success_index[winner_index][0]) \
-             * bingo_card_success_index[winner_index][1]
-
-    return score
 
 @timer_func
 def part_2() -> int:
     """
     :return:   Final score of the last board to win (ultimate loser)
     """
+    win_order, win_turns, scores = play_bingo(*read_bingo("puzzle_input.txt"))
 
-    with open("puzzle_input.txt", "r") as f:
-        puzzle_input = f.read().splitlines()
-
-    # reading generated numbers
-    numbers_drawn = list(map(int, puzzle_input[0].split(',')))
-
-    # reading bingo cards
-    bingo_cards_all = []
-    for i in range(2, len(puzzle_input)+1, 6):
-        bingo_card = []
-        for row in puzzle_input[i:i+5]:
-            row = list(filter(None, row.split(' ')))  # delete empty strings
-            bingo_card.append(list(row))
-        bingo_cards_all.append(np.asarray(bingo_card, int))
-
-    bingo_card_success_index = []
-    no_of_trials_index = []
-    for no_bingo_card, bingo_card in enumerate(bingo_cards_all):
-        successful_marks = 0
-        for no_of_trials, number in enumerate(numbers_drawn):
-            new_bingo_card = np.where(bingo_card == number, -1, bingo_card)
-
-            # check if bingo_card changed
-            if np.array_equal(new_bingo_card, bingo_card):
-                pass
-            else:
-                successful_marks += 1
-                bingo_card = new_bingo_card
-                indices = np.asarray(new_bingo_card == -1).nonzero()
-
-                # check if there are 5 or more marks
-                if len(indices[0]) > 4:
-                    una_1 = np.unique(indices[0], return_counts=True)
-                    una_2 = np.unique(indices[1], return_counts=True)
-
-                    # check if there are 5 marks in a row in the vertical or horizontal direction
-                    if (
-                                (not np.where(una_1[1] == 5)[0].tolist() == []) or
-                                (not np.where(una_2[1] == 5)[0].tolist() == [])
-                    ):
-
-                        # record successful bingo
-                        no_of_trials_index.append(no_of_trials)
-                        bingo_card_success_index.append((successful_marks, number))
-                        bingo_cards_all[no_bingo_card] = new_bingo_card
-                        break
-
-    loser_index = no_of_trials_index.index(max(no_of_trials_index))
-    score = (np.sum(bingo_cards_all[loser_index])
-             + bingo_card_success_index[loser_index][0]) \
-             * bingo_card_success_index[loser_index][1]
-
-    return score
+    # of several boards winning on the last draw, the first one counts
+    last_turn = win_turns[win_order[-1]]
+    loser_index = win_order[np.searchsorted(win_turns[win_order], last_turn)]
+    return int(scores[loser_index])
 
 
 if __name__ == '__main__':
@@ -1,7 +1,14 @@
 from time import monotonic_ns
 import logging
 import sys
-from collections import Counter
+import os
+from bisect import bisect_left, bisect_right, insort
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+
+HORIZONTAL, VERTICAL, DIAGONAL, ANTIDIAGONAL = 0, 1, 2, 3
+LINE_COEFFICIENTS = [(0, 1), (1, 0), (1, -1), (1, 1)]  # (a, b) of the lines a * x + b * y = key of every family
 
 logging.basicConfig(
     level=logging.DEBUG,
@@ -32,88 +39,402 @@ def read_vents(puzzle_file: str) -> list[tuple[list, list]]:
         return v_all
 
 
+def read_vent_array(puzzle_file: str) -> np.ndarray:
+    """
+    :param puzzle_file: one vent per line as "x1,y1 -> x2,y2"
+    :return: array of all vents with shape (no. of vents, 4) holding x1, y1, x2, y2
+    """
+    with open(puzzle_file, "r") as f:
+        v_all = np.array(f.read().replace("->", " ").replace(",", " ").split(), dtype=np.int64).reshape(-1, 4)
+        logging.info("Loaded all vent vectors")
+        return v_all
+
+
+def rasterize_vents(v_all: np.ndarray, first_step: np.ndarray = None,
+                    last_step: np.ndarray = None) -> (np.ndarray, np.ndarray, np.ndarray):
+    """
+    :param v_all: array of vents with shape (no. of vents, 4) holding x1, y1, x2, y2
+    :param first_step: first point of every vent to rasterize, counted from (x1, y1), defaults to 0
+    :param last_step: last point of every vent to rasterize, counted from (x1, y1), defaults to the end point
+    :return: x and y of every point covered by a vent together with the index of that vent
+    """
+    x1, y1, x2, y2 = v_all.T
+    valid = (x1 == x2) | (y1 == y2) | (np.abs(x2 - x1) == np.abs(y2 - y1))
+    if not valid.all():
+        logging.warning(f"Skipping {np.count_nonzero(~valid)} vents that are neither straight nor diagonal")
+
+    # every vent covers max(|dx|, |dy|) + 1 points, one step of (sign(dx), sign(dy)) apart
+    first_step = np.zeros(len(v_all), dtype=np.int64) if first_step is None else first_step
+    last_step = np.maximum(np.abs(x2 - x1), np.abs(y2 - y1)) if last_step is None else last_step
+    lengths = np.where(valid, np.maximum(last_step - first_step + 1, 0), 0)
+    vent_index = np.repeat(np.arange(len(v_all)), lengths)
+    steps = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths - first_step, lengths)
+    x = x1[vent_index] + np.sign(x2 - x1)[vent_index] * steps
+    y = y1[vent_index] + np.sign(y2 - y1)[vent_index] * steps
+    return x, y, vent_index
+
+
+def count_multiples(cells: np.ndarray) -> int:
+    """
+    :param cells: non-negative linear index of every covered point
+    :return: number of cells covered more than once
+    """
+    if len(cells) == 0:
+        return 0
+    # a dense histogram is fastest as long as the grid is not much larger than the number of points
+    if cells.max() < 4 * len(cells) + 2**20:
+        return int(np.count_nonzero(np.bincount(cells) > 1))
+    return int(np.count_nonzero(np.unique(cells, return_counts=True)[1] > 1))
+
+
+def count_overlaps(v_all: np.ndarray) -> (int, int):
+    """
+    :param v_all: array of vents with shape (no. of vents, 4) holding x1, y1, x2, y2
+    :return: number of overlaps of the horizontal and vertical vents, and number of overlaps of all vents
+    """
+    x, y, vent_index = rasterize_vents(v_all)
+    x1, y1, x2, y2 = v_all.T
+    straight = ((x1 == x2) | (y1 == y2))[vent_index]
+
+    x_min = x.min(initial=0)
+    cells = (y - y.min(initial=0)) * (x.max(initial=0) - x_min + 1) + (x - x_min)
+    return count_multiples(cells[straight]), count_multiples(cells)
+
+
+def vent_lines(v_all: np.ndarray) -> (np.ndarray, np.ndarray, np.ndarray, np.ndarray):
+    """
+    :param v_all: array of vents with shape (no. of vents, 4) holding x1, y1, x2, y2
+    :return: family (HORIZONTAL, VERTICAL, DIAGONAL, ANTIDIAGONAL) and key of the line every vent lies on
+     (y, x, x - y and x + y respectively), and the first and last point of the vent along that line
+     (y for vertical lines, x for all others)
+    """
+    x1, y1, x2, y2 = v_all.T
+    conditions = [y1 == y2, x1 == x2, (np.abs(x2 - x1) == np.abs(y2 - y1)) & (np.sign(x2 - x1) == np.sign(y2 - y1)),
+                  (np.abs(x2 - x1) == np.abs(y2 - y1))]
+    family = np.select(conditions, [HORIZONTAL, VERTICAL, DIAGONAL, ANTIDIAGONAL], -1)
+    key = np.select(conditions, [y1, x1, x1 - y1, x1 + y1], 0)
+    start = np.where(family == VERTICAL, np.minimum(y1, y2), np.minimum(x1, x2))
+    end = np.where(family == VERTICAL, np.maximum(y1, y2), np.maximum(x1, x2))
+
+    valid = family >= 0
+    if not valid.all():
+        logging.warning(f"Skipping {np.count_nonzero(~valid)} vents that are neither straight nor diagonal")
+    return family[valid], key[valid], start[valid], end[valid]
+
+
+def _point(family: int, key: int, t: int) -> (int, int):
+    return [(t, key), (key, t), (t, t - key), (t, key - t)][family]
+
+
+def _key(family: int, x: int, y: int) -> int:
+    return [y, x, x - y, x + y][family]
+
+
+def _param(family: int, x: int, y: int) -> int:
+    return y if family == VERTICAL else x
+
+
+def _crossing(family_1: int, key_1: int, family_2: int, key_2: int) -> tuple[int, int] | None:
+    """
+    :return: point where two lines of different families cross, None if it is not a lattice point
+    """
+    # every line is a * x + b * y = key
+    (a_1, b_1), (a_2, b_2) = LINE_COEFFICIENTS[family_1], LINE_COEFFICIENTS[family_2]
+    det = a_1 * b_2 - a_2 * b_1
+    x, x_rest = divmod(key_1 * b_2 - key_2 * b_1, det)
+    y, y_rest = divmod(a_1 * key_2 - a_2 * key_1, det)
+    return None if x_rest or y_rest else (x, y)
+
+
+def _runs(line: np.ndarray, start: np.ndarray, end: np.ndarray) -> (np.ndarray, np.ndarray, np.ndarray):
+    """
+    :return: line, start and end of the runs formed by merging touching pieces on the same line
+    """
+    if len(line) == 0:
+        return line, start, end
+    new_run = np.ones(len(line), dtype=bool)
+    new_run[1:] = (line[1:] != line[:-1]) | (start[1:] != end[:-1] + 1)
+    run_start = np.flatnonzero(new_run)
+    run_end = np.append(run_start[1:] - 1, len(line) - 1)
+    return line[run_start], start[run_start], end[run_end]
+
+
+def _line_crossings(family_1: int, pieces_1: list, family_2: int, pieces_2: list) -> set:
+    """
+    :param pieces_1: (key, start, end) of the covered pieces of lines of the first family
+    :param pieces_2: (key, start, end) of the covered pieces of lines of the second family
+    :return: all lattice points where a piece of the first family crosses a piece of the second family
+    """
+
+    # in the plane spanned by the keys of both families, the pieces of the first family run parallel to
+    # the key_2 axis and those of the second family parallel to the key_1 axis, so sweeping along key_2
+    # only needs the key_1 of the first family pieces cut by the sweep line
+    events = []
+    for key_1, start, end in pieces_1:
+        first, last = _point(family_1, key_1, start), _point(family_1, key_1, end)
+        lo, hi = sorted((_key(family_2, *first), _key(family_2, *last)))
+        events.append((lo, 0, key_1, 0))
+        events.append((hi, 2, key_1, 0))
+    for key_2, start, end in pieces_2:
+        first, last = _point(family_2, key_2, start), _point(family_2, key_2, end)
+        lo, hi = sorted((_key(family_1, *first), _key(family_1, *last)))
+        events.append((key_2, 1, lo, hi))
+    events.sort()  # at the same key_2 pieces are added first and removed last
+
+    points = set()
+    active = []
+    for key_2, kind, lo, hi in events:
+        if kind == 0:
+            insort(active, lo)
+        elif kind == 2:
+            del active[bisect_left(active, lo)]
+        else:
+            for key_1 in active[bisect_left(active, lo):bisect_right(active, hi)]:
+                point = _crossing(family_1, key_1, family_2, key_2)
+                if point is not None:
+                    points.add(point)
+    return points
+
+
+def count_multiples_sweep(family: np.ndarray, key: np.ndarray, start: np.ndarray, end: np.ndarray) -> int:
+    """
+    :param family: family of the line of every vent, see vent_lines
+    :param key: key of the line of every vent
+    :param start: first point of every vent along its line
+    :param end: last point of every vent along its line
+    :return: number of lattice points covered by more than one vent
+    """
+    if len(family) == 0:
+        return 0
+    lines, line_of = np.unique(np.stack((family, key), axis=1), axis=0, return_inverse=True)
+    line_of = line_of.ravel()
+
+    # sweep along every line: after each event the coverage holds until the next event on the same line
+    pos = np.concatenate((start, end + 1))
+    delta = np.concatenate((np.ones(len(start), dtype=np.int64), -np.ones(len(end), dtype=np.int64)))
+    line = np.concatenate((line_of, line_of))
+    order = np.lexsort((pos, line))
+    pos, line = pos[order], line[order]
+    coverage = np.cumsum(delta[order])[:-1]
+    piece = (line[1:] == line[:-1]) & (pos[1:] > pos[:-1])
+    piece_line, piece_start, piece_end = line[:-1], pos[:-1], pos[1:] - 1
+
+    # points covered twice by vents on the same line
+    double = piece & (coverage > 1)
+    no_multiples = int((piece_end[double] - piece_start[double] + 1).sum())
+    double_runs = {}
+    for i, s, e in zip(*(i.tolist() for i in _runs(piece_line[double], piece_start[double], piece_end[double]))):
+        double_runs.setdefault(i, ([], []))
+        double_runs[i][0].append(s)
+        double_runs[i][1].append(e)
+
+    # points where covered pieces of lines from two different families cross
+    covered = piece & (coverage > 0)
+    pieces = {f: [] for f in range(4)}
+    for i, s, e in zip(*(i.tolist() for i in _runs(piece_line[covered], piece_start[covered], piece_end[covered]))):
+        pieces[int(lines[i, 0])].append((int(lines[i, 1]), s, e))
+    crossings = set()
+    for family_1 in range(4):
+        for family_2 in range(family_1 + 1, 4):
+            if pieces[family_1] and pieces[family_2]:
+                crossings |= _line_crossings(family_1, pieces[family_1], family_2, pieces[family_2])
+
+    # every crossing counts once, minus the times it was already counted as covered twice on one of its lines
+    line_index = {(int(f), int(k)): i for i, (f, k) in enumerate(lines)}
+    for x, y in crossings:
+        no_multiples += 1
+        for f in range(4):
+            i = line_index.get((f, _key(f, x, y)))
+            if i in double_runs:
+                starts, ends = double_runs[i]
+                j = bisect_right(starts, _param(f, x, y)) - 1
+                if j >= 0 and ends[j] >= _param(f, x, y):
+                    no_multiples -= 1
+
+    return no_multiples
+
+
+def count_overlaps_sweep(v_all: np.ndarray) -> (int, int):
+    """
+    :param v_all: array of vents with shape (no. of vents, 4) holding x1, y1, x2, y2
+    :return: number of overlaps of the horizontal and vertical vents, and number of overlaps of all vents,
+     without visiting the points of the vents one by one
+    """
+    family, key, start, end = vent_lines(v_all)
+    straight = family <= VERTICAL
+    return (count_multiples_sweep(family[straight], key[straight], start[straight], end[straight]),
+            count_multiples_sweep(family, key, start, end))
+
+
+_tile_state = {}
+
+
+def _init_tile_worker(v_all: np.ndarray, grid_name: str, origin: (int, int), shape: (int, int)):
+    _tile_state.update(v_all=v_all, grid_name=grid_name, origin=origin, shape=shape)
+
+
+def _rasterize_tile(row_lo: int, row_hi: int):
+    """
+    Adds the vent points in the grid rows of the tile to the shared count grid (saturating at 255)
+
+    :param row_lo: first grid row of the tile
+    :param row_hi: grid row after the last row of the tile
+    """
+    v_all, (x_min, y_min), (height, width) = _tile_state["v_all"], _tile_state["origin"], _tile_state["shape"]
+    x1, y1, x2, y2 = v_all.T
+    last_step = np.maximum(np.abs(x2 - x1), np.abs(y2 - y1))
+
+    # clip every vent to the steps whose y lies in the rows of the tile
+    dy = np.sign(y2 - y1)
+    row_1 = y1 - y_min
+    first_step = np.select([dy > 0, dy < 0], [row_lo - row_1, row_1 - (row_hi - 1)], 0)
+    tile_last_step = np.select([dy > 0, dy < 0], [row_hi - 1 - row_1, row_1 - row_lo], last_step)
+    inside = (dy != 0) | ((row_lo <= row_1) & (row_1 < row_hi))
+    first_step = np.where(inside, np.maximum(first_step, 0), 1)
+    tile_last_step = np.where(inside, np.minimum(tile_last_step, last_step), 0)
+
+    x, y, _ = rasterize_vents(v_all, first_step, tile_last_step)
+    cells, counts = np.unique((y - y_min) * width + (x - x_min), return_counts=True)
+
+    # the tiles own disjoint rows, so every worker writes only its own part of the grid
+    grid_memory = SharedMemory(_tile_state["grid_name"])
+    grid = np.ndarray(height * width, dtype=np.uint8, buffer=grid_memory.buf)
+    grid[cells] = np.minimum(counts, 255)
+    del grid
+    grid_memory.close()
+
+
+def count_overlaps_parallel(v_all: np.ndarray, processes: int | None = None, no_tiles: int | None = None) -> int:
+    """
+    :param v_all: array of vents with shape (no. of vents, 4) holding x1, y1, x2, y2
+    :param processes: number of worker processes, defaults to the number of cores
+    :param no_tiles: number of bands of grid rows rasterized separately, defaults to four per process
+    :return: number of overlaps of all vents
+    """
+    processes = processes or os.cpu_count()
+    x_min, y_min = v_all[:, [0, 2]].min(), v_all[:, [1, 3]].min()
+    height = int(v_all[:, [1, 3]].max() - y_min + 1)
+    width = int(v_all[:, [0, 2]].max() - x_min + 1)
+    boundaries = np.linspace(0, height, min(no_tiles or 4 * processes, height) + 1).astype(int)
+
+    # the workers fill the shared count grid tile by tile, the overlaps are then counted over the whole grid
+    grid_memory = SharedMemory(create=True, size=height * width)
+    try:
+        grid = np.ndarray((height, width), dtype=np.uint8, buffer=grid_memory.buf)
+        grid[:] = 0
+        with Pool(processes, _init_tile_worker, (v_all, grid_memory.name, (x_min, y_min), (height, width))) as pool:
+            pool.starmap(_rasterize_tile, zip(boundaries[:-1], boundaries[1:]))
+        no_overlap = int(np.count_nonzero(grid > 1))
+        del grid
+    finally:
+        grid_memory.close()
+        grid_memory.unlink()
+
+    return no_overlap
+
+
+class VentHeatmap:
+    """
+    Count grid of the vents with a 2-D prefix-sum table of the dangerous cells (covered more than once),
+    so the dangerous cells in any rectangle are counted in O(1)
+    """
+
+    def __init__(self, counts: np.ndarray = None, origin: (int, int) = (0, 0)):
+        """
+        :param counts: number of vents covering every cell, indexed [y - origin y, x - origin x]
+        :param origin: x and y of the first cell of the grid
+        """
+        self.counts = np.zeros((0, 0), dtype=np.uint32) if counts is None else counts
+        self.origin = tuple(int(i) for i in origin)
+        self._prefix = np.zeros((self.counts.shape[0] + 1, self.counts.shape[1] + 1), dtype=np.int64)
+        self._stale_row = 0  # first grid row whose prefix sums need to be recalculated
+
+    @classmethod
+    def from_vents(cls, v_all: np.ndarray) -> "VentHeatmap":
+        heatmap = cls()
+        heatmap.add_vents(v_all)
+        return heatmap
+
+    @classmethod
+    def load(cls, path: str) -> "VentHeatmap":
+        with np.load(path) as saved:
+            return cls(saved["counts"], saved["origin"])
+
+    def save(self, path: str):
+        np.savez_compressed(path, counts=self.counts, origin=np.array(self.origin))
+
+    def _grow(self, x_min: int, y_min: int, x_max: int, y_max: int):
+        height, width = self.counts.shape
+        if height and width:
+            x_min, y_min = min(x_min, self.origin[0]), min(y_min, self.origin[1])
+            x_max, y_max = max(x_max, self.origin[0] + width - 1), max(y_max, self.origin[1] + height - 1)
+        counts = np.zeros((y_max - y_min + 1, x_max - x_min + 1), dtype=np.uint32)
+        row, column = self.origin[1] - y_min, self.origin[0] - x_min
+        counts[row:row + height, column:column + width] = self.counts
+        self.counts, self.origin = counts, (x_min, y_min)
+        self._prefix = np.zeros((counts.shape[0] + 1, counts.shape[1] + 1), dtype=np.int64)
+        self._stale_row = 0
+
+    def add_vents(self, v_all: np.ndarray):
+        """
+        :param v_all: array of vents with shape (no. of vents, 4) holding x1, y1, x2, y2
+        """
+        x, y, _ = rasterize_vents(v_all)
+        if len(x) == 0:
+            return
+        height, width = self.counts.shape
+        x_min, y_min, x_max, y_max = int(x.min()), int(y.min()), int(x.max()), int(y.max())
+        if (not height or not width or x_min < self.origin[0] or y_min < self.origin[1]
+                or x_max >= self.origin[0] + width or y_max >= self.origin[1] + height):
+            self._grow(x_min, y_min, x_max, y_max)
+
+        rows, columns = y - self.origin[1], x - self.origin[0]
+        cells, covered = np.unique(rows * self.counts.shape[1] + columns, return_counts=True)
+        self.counts.ravel()[cells] += covered.astype(np.uint32)
+        self._stale_row = min(self._stale_row, int(rows.min()))
+
+    def _update_prefix(self):
+        first = self._stale_row
+        if first < self.counts.shape[0]:
+            dangerous = (self.counts[first:] > 1).cumsum(axis=1).cumsum(axis=0)
+            self._prefix[first + 1:, 1:] = dangerous + self._prefix[first, 1:]
+        self._stale_row = self.counts.shape[0]
+
+    def count_dangerous(self, x_lo: int, y_lo: int, x_hi: int, y_hi: int) -> int:
+        """
+        :return: number of cells covered more than once in the rectangle from (x_lo, y_lo) to (x_hi, y_hi),
+         both corners included
+        """
+        self._update_prefix()
+        height, width = self.counts.shape
+        column_lo, column_hi = max(x_lo - self.origin[0], 0), min(x_hi - self.origin[0] + 1, width)
+        row_lo, row_hi = max(y_lo - self.origin[1], 0), min(y_hi - self.origin[1] + 1, height)
+        if column_lo >= column_hi or row_lo >= row_hi:
+            return 0
+        prefix = self._prefix
+        return int(prefix[row_hi, column_hi] - prefix[row_lo, column_hi]
+                   - prefix[row_hi, column_lo] + prefix[row_lo, column_lo])
+
+
 @timer_func
 def part_1() -> int:
     """
     :return:   Number of points where horizontal and vertical vents overlap
     """
     logging.info("Calculating vent overlaps for vertical and horizontal vents")
-    v_all = read_vents("puzzle_input.txt")
-
-    # separate horizontal and vertical vent vectors from rest
-    v_vh = [i for i in v_all if (i[0][0] == i[1][0] or i[0][1] == i[1][1])]
-
-    # generate all vent points
-    points = []
-    for vi in v_vh:
-        if vi[0][0] == vi[1][0]:
-            if vi[0][1] < vi[1][1]:
-                for i in range(vi[0][1], vi[1][1] + 1):
-                    points.append((vi[0][0], i))
-            else:
-                for i in range(vi[1][1], vi[0][1] + 1):
-                    points.append((vi[0][0], i))
-        elif vi[0][1] == vi[1][1]:
-            if vi[0][0] < vi[1][0]:
-                for i in range(vi[0][0], vi[1][0] + 1):
-                    points.append((i, vi[0][1]))
-            else:
-                for i in range(vi[1][0], vi[0][0] + 1):
-                    points.append((i, vi[0][1]))
-
-    # finding overlap
-    overlap = Counter(points)
-    overlap = [i for i in overlap.items() if i[1] > 1]
-    no_overlap = len(overlap)
+    no_overlap = count_overlaps(read_vent_array("puzzle_input.txt"))[0]
     logging.info(f"Total number of overlaps is: {no_overlap}")
 
     return no_overlap
 
+
 @timer_func
 def part_2() -> int:
     """
     :return:   Number of overlaps for all vents
     """
     logging.info("Calculating vent overlaps for all vents (incl. diagonal)")
-    v_all = read_vents("puzzle_input.txt")
-
-    # generate all vent points
-    points = []
-    for vi in v_all:
-        if vi[0][0] == vi[1][0]:
-            if vi[0][1] < vi[1][1]:
-                for i in range(vi[0][1], vi[1][1] + 1):
-                    points.append((vi[0][0], i))
-            else:
-                for i in range(vi[1][1], vi[0][1] + 1):
-                    points.append((vi[0][0], i))
-        elif vi[0][1] == vi[1][1]:
-            if vi[0][0] < vi[1][0]:
-                for i in range(vi[0][0], vi[1][0] + 1):
-                    points.append((i, vi[0][1]))
-            else:
-                for i in range(vi[1][0], vi[0][0] + 1):
-                    points.append((i, vi[0][1]))
-        elif vi[0][0] < vi[1][0] and vi[0][1] < vi[1][1]:
-            for i, j in zip(range(vi[0][0], vi[1][0] + 1), range(vi[0][1], vi[1][1] + 1)):
-                points.append((i, j))
-        elif vi[0][0] > vi[1][0] and vi[0][1] < vi[1][1]:
-            for i, j in zip(range(vi[0][0], vi[1][0] - 1, -1), range(vi[0][1], vi[1][1] + 1)):
-                points.append((i, j))
-        elif vi[0][0] < vi[1][0] and vi[0][1] > vi[1][1]:
-            for i, j in zip(range(vi[0][0], vi[1][0] + 1), range(vi[0][1], vi[1][1] - 1, -1)):
-                points.append((i, j))
-        elif vi[0][0] > vi[1][0] and vi[0][1] > vi[1][1]:
-            for i, j in zip(range(vi[0][0], vi[1][0] - 1, -1), range(vi[0][1], vi[1][1] - 1, -1)):
-                points.append((i, j))
-        else:
-            print(f"somethings up,{vi}")
-    
-
-    # finding overlap
-    overlap = Counter(points)
-    overlap = [i for i in overlap.items() if i[1] > 1]
-    no_overlap = len(overlap)
+    no_overlap = count_overlaps(read_vent_array("puzzle_input.txt"))[1]
     logging.info(f"Total number of overlaps is: {no_overlap}")
 
     return no_overlap
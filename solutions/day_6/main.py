@@ -3,7 +3,7 @@ import logging
 import sys
 from dataclasses import dataclass
 from collections import Counter
-from copy import copy
+import numpy as np
 
 logging.basicConfig(
     level=logging.DEBUG,
@@ -15,6 +15,16 @@ logging.basicConfig(
 )
 
 
+# TRANSITION[i][j] is the number of fish of age j that a fish of age i turns into after one day
+TRANSITION = [[int(j == i - 1 or (i == 0 and j in (6, 8))) for j in range(9)] for i in range(9)]
+
+# TRANSITION to the power of 2 ** i for every modulus, filled in as longer horizons are requested
+_transition_squares = {}
+
+# number of lanternfish that a single fish of every age turns into, for every (days, modulus)
+_horizon_weights = {}
+
+
 def timer_func(func):
     def wrap_func(*args, **kwargs):
         t1 = monotonic_ns()
@@ -75,31 +85,163 @@ class LanternfishSwarm:
             self.reproduce()
 
 
+class LanternfishArraySwarm:
+    """
+    Agent-based swarm like LanternfishSwarm, but with the timer of every lanternfish stored in a growable
+    uint8 array that ages all fish at once
+    """
+    block_size = 2**24  # fish aged at once, bounds the temporary memory of a day
+
+    def __init__(self, ages: list[int], max_bytes: int | None = None, track_parents: bool = False):
+        """
+        :param ages: timers of the initial lanternfish
+        :param max_bytes: memory budget of the swarm, a MemoryError is raised when it is exceeded
+        :param track_parents: keep the index of the parent of every fish, -1 for the initial fish
+        """
+        self.max_bytes = max_bytes
+        self.size = len(ages)
+        self._timers = np.array(ages, dtype=np.uint8)
+        self._parents = np.full(self.size, -1, dtype=np.int64) if track_parents else None
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def timers(self) -> np.ndarray:
+        return self._timers[:self.size]
+
+    @property
+    def parents(self) -> np.ndarray | None:
+        return None if self._parents is None else self._parents[:self.size]
+
+    def _reserve(self, size: int):
+        capacity = len(self._timers)
+        if size <= capacity:
+            return
+        bytes_per_fish = 1 if self._parents is None else 9
+        # the old arrays are alive until the grown arrays are filled, so both count against the budget
+        limit = size * 2 if self.max_bytes is None else self.max_bytes // bytes_per_fish - capacity
+        if size > limit:
+            raise MemoryError(f"{size:,d} lanternfish exceed the budget of {self.max_bytes:,d} bytes")
+        capacity = min(max(2 * capacity, size), limit)
+        self._timers = np.resize(self._timers, capacity)
+        if self._parents is not None:
+            self._parents = np.resize(self._parents, capacity)
+
+    def reproduce(self, no_births: int, parents: np.ndarray = None):
+        self._reserve(self.size + no_births)
+        self._timers[self.size:self.size + no_births] = 8
+        if self._parents is not None:
+            self._parents[self.size:self.size + no_births] = -1 if parents is None else parents
+        self.size += no_births
+
+    def pass_day(self):
+        blocks = [(start, min(start + self.block_size, self.size)) for start in range(0, self.size, self.block_size)]
+        # reserve the room for the newborn first, so a MemoryError leaves the swarm untouched
+        no_births = sum(int(np.count_nonzero(self._timers[start:end] == 0)) for start, end in blocks)
+        self._reserve(self.size + no_births)
+
+        parents = []
+        for start, end in blocks:
+            timers = self._timers[start:end]
+            # same as Lanternfish.get_older for every fish of the block
+            giving_birth = timers == 0
+            timers -= 1
+            timers[giving_birth] = 6
+            if self._parents is not None:
+                parents.append(np.flatnonzero(giving_birth) + start)
+        self.reproduce(no_births, np.concatenate(parents) if parents else None)
+
+
 @timer_func
 def part_1() -> int:
     """
     :return:   Number of lanternfish after 80 days
     """
     logging.info("Calculating number of lanternfish after 80 days")
-    l_all = read_lanternfish("puzzle_input.txt")
 
     # simulate a swarm of lanternfish via agent-based-modelling
-    initial_lanternfish_swarm = []
-    for i in l_all:
-        initial_lanternfish_swarm.append(Lanternfish(i))
-
-    all_fish = LanternfishSwarm(initial_lanternfish_swarm)
+    all_fish = LanternfishArraySwarm(read_lanternfish("puzzle_input.txt"))
 
     for i in range(80):
         all_fish.pass_day()
 
-    no_fish = len(all_fish.swarm)
+    no_fish = len(all_fish)
 
     logging.info(f"Number of Lanternfish after 80 days is {no_fish}")
 
     return no_fish
 
 
+def _multiply(a: list[list[int]], b: list[list[int]], modulus: int | None) -> list[list[int]]:
+    product = [[sum(a_ik * b_kj for a_ik, b_kj in zip(row, column)) for column in zip(*b)] for row in a]
+    return product if modulus is None else [[i % modulus for i in row] for row in product]
+
+
+def transition_squares(no_squares: int, modulus: int | None = None) -> list[list[list[int]]]:
+    """
+    :param no_squares: number of squares needed
+    :param modulus: modulus of the matrix entries, None for exact integers
+    :return: the transition matrix to the power of 1, 2, 4, 8, ...
+    """
+    squares = _transition_squares.setdefault(modulus, [TRANSITION])
+    while len(squares) < no_squares:
+        squares.append(_multiply(squares[-1], squares[-1], modulus))
+    return squares
+
+
+def transition_power(days: int, modulus: int | None = None) -> list[list[int]]:
+    """
+    :return: the transition matrix to the power of days, by repeated squaring
+    """
+    power = [[int(i == j) for j in range(9)] for i in range(9)]
+    for bit, square in enumerate(transition_squares(days.bit_length(), modulus)):
+        if days >> bit & 1:
+            power = _multiply(power, square, modulus)
+    return power
+
+
+def population_after(ages: Counter | list[int] | np.ndarray, days: int, modulus: int | None = None) -> int:
+    """
+    :param ages: number of lanternfish of every age, as a Counter or as a sequence of 9 counts
+    :param days: number of days passing
+    :param modulus: modulus of the result, None for the exact number
+    :return: number of lanternfish after the given number of days
+    """
+    # exact Python integers, so the counts of a NumPy array do not overflow
+    population = [[int(ages.get(age, 0) if isinstance(ages, dict) else ages[age]) for age in range(9)]]
+
+    # the powers of the matrix commute, so the population can pass through the squares one after the other
+    for bit, square in enumerate(transition_squares(days.bit_length(), modulus)):
+        if days >> bit & 1:
+            population = _multiply(population, square, modulus)
+
+    no_fish = sum(population[0])
+    return no_fish if modulus is None else no_fish % modulus
+
+
+def horizon_weights(days: int, modulus: int | None = None) -> list[int]:
+    """
+    :return: number of lanternfish that a single fish of every age turns into after the given number of days
+    """
+    if (days, modulus) not in _horizon_weights:
+        _horizon_weights[days, modulus] = [sum(row) if modulus is None else sum(row) % modulus
+                                           for row in transition_power(days, modulus)]
+    return _horizon_weights[days, modulus]
+
+
+def population_table(populations: np.ndarray | list, horizons: list[int], modulus: int | None = None) -> np.ndarray:
+    """
+    :param populations: number of lanternfish of every age for every population, with shape (no. of populations, 9)
+    :param horizons: numbers of days passing
+    :param modulus: modulus of the results, None for exact numbers
+    :return: number of lanternfish of every population (rows) after every number of days (columns)
+    """
+    weights = np.array([horizon_weights(days, modulus) for days in horizons], dtype=object).reshape(-1, 9).T
+    table = np.array(populations, dtype=object).reshape(-1, 9) @ weights
+    return table if modulus is None else table % modulus
+
+
 @timer_func
 def part_2() -> int:
     """
@@ -107,34 +249,7 @@ def part_2() -> int:
     No longer agent-based simulation, direct calculation of number of lanternfish
     """
     logging.info("Calculating number of lanternfish after 256 days")
-    c_dict = dict(count_lanternfish("puzzle_input.txt"))
-
-    # establishing a temporary dictionary
-    next_dict = {}
-    for i in range(9):
-        try:
-            next_dict[i] = c_dict[i]
-        except KeyError:
-            next_dict[i] = 0
-
-    for i in range(256):
-        for age in range(9):
-            if age == 0:
-                try:
-                    next_dict[8] += c_dict[age]
-                    next_dict[6] += c_dict[age]
-                    next_dict[0] -= c_dict[age]
-                except KeyError:
-                    logging.error(f"no fish of age {age}")
-            else:
-                try:
-                    next_dict[age] -= c_dict[age]
-                    next_dict[age - 1] += c_dict[age]
-                except KeyError:
-                    logging.error(f"no fish of age {age}")
-        c_dict = copy(next_dict)
-
-    no_fish = sum(c_dict.values())
+    no_fish = population_after(count_lanternfish("puzzle_input.txt"), 256)
 
     logging.info(f"Number of Lanternfish after 256 days is {no_fish}")
 
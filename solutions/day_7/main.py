@@ -2,7 +2,8 @@ from time import monotonic_ns
 import logging
 import sys
 from collections import Counter
-from scipy.optimize import minimize_scalar
+from math import comb
+import numpy as np
 
 logging.basicConfig(
     level=logging.DEBUG,
@@ -33,18 +34,236 @@ def count_crabs(puzzle_file: str) -> Counter:
         logging.info("Counted the positions of all crabs")
         return c
 
+def crab_arrays(c_dict: dict) -> (np.ndarray, np.ndarray):
+    """
+    :param c_dict: number of crabs at every position
+    :return: sorted positions and the number of crabs at each of them
+    """
+    positions = np.fromiter(c_dict.keys(), dtype=np.int64, count=len(c_dict))
+    counts = np.fromiter(c_dict.values(), dtype=np.int64, count=len(c_dict))
+    order = np.argsort(positions)
+    return positions[order], counts[order]
+
+
+def linear_fuel(positions: np.ndarray, counts: np.ndarray, x: int) -> int:
+    """
+    :return: fuel all crabs need to get to point x when every step costs 1
+    """
+    return int((np.abs(positions - x) * counts).sum())
+
+
+def triangular_fuel(positions: np.ndarray, counts: np.ndarray, x: int) -> int:
+    """
+    :return: fuel all crabs need to get to point x when every step costs 1 more than the last
+    """
+    distance = np.abs(positions - x)
+    return int((distance * (distance + 1) // 2 * counts).sum())
+
+
+def min_fuel_linear(c_dict: dict) -> (int, int):
+    """
+    :param c_dict: number of crabs at every position
+    :return: most efficient position and the fuel all crabs need to get there when every step costs 1
+    """
+    positions, counts = crab_arrays(c_dict)
+
+    # the sum of distances is smallest at the median of all crabs
+    cumulative = np.cumsum(counts)
+    x = int(positions[np.searchsorted(cumulative, (cumulative[-1] + 1) // 2)])
+    return x, linear_fuel(positions, counts, x)
+
+
+def min_fuel_triangular(c_dict: dict) -> (int, int):
+    """
+    :param c_dict: number of crabs at every position
+    :return: most efficient position and the fuel all crabs need to get there when every step costs 1 more
+    """
+    positions, counts = crab_arrays(c_dict)
+
+    # the fuel is (d^2 + d) / 2 per crab, whose real minimum lies within 1/2 of the mean position,
+    # so the integer minimum is one of the positions next to the mean
+    mean_floor = int((positions * counts).sum()) // int(counts.sum())
+    return min(((x, triangular_fuel(positions, counts, x)) for x in range(mean_floor - 1, mean_floor + 3)),
+               key=lambda candidate: candidate[1])
+
+
+def crab_histogram(c_dict: dict) -> (int, np.ndarray):
+    """
+    :param c_dict: number of crabs at every position
+    :return: first position and the number of crabs at every position from there to the last crab
+    """
+    positions, counts = crab_arrays(c_dict)
+    histogram = np.zeros(positions[-1] - positions[0] + 1, dtype=np.int64)
+    histogram[positions - positions[0]] = counts
+    return int(positions[0]), histogram
+
+
+def polynomial_fuel_curve(histogram: np.ndarray, coefficients: list[int], divisor: int = 1) -> np.ndarray:
+    """
+    :param histogram: number of crabs at every position, counted from the first position
+    :param coefficients: a_0, a_1, ... of the fuel a crab needs for a distance d, (a_0 + a_1 * d + a_2 * d^2 + ...)
+    :param divisor: common divisor of the fuel, e.g. 2 for the triangular fuel (d + d^2) / 2
+    :return: fuel all crabs need to get to every position of the histogram
+    """
+    degree = len(coefficients) - 1
+    x = np.arange(len(histogram), dtype=np.int64)
+    # fall back to exact Python integers where the moments could overflow int64
+    if int(histogram.sum()) * max(len(histogram), 2) ** degree * 2 ** degree >= 2**62:
+        x, histogram = x.astype(object), histogram.astype(object)
+
+    # moments j of the crabs up to and including x, and beyond x
+    moments_le = [np.cumsum(histogram * x**j) for j in range(degree + 1)]
+    moments_gt = [moments[-1] - moments for moments in moments_le]
+
+    # sum of c * |x - p|^k, split by the side of x the crabs are on and expanded binomially
+    fuel = 0
+    for k, a_k in enumerate(coefficients):
+        if a_k:
+            fuel = fuel + a_k * sum(comb(k, j) * (x**(k - j) * (-1)**j * moments_le[j]
+                                                    + (-x)**(k - j) * moments_gt[j]) for j in range(k + 1))
+    return fuel // divisor
+
+
+def fuel_curves(c_dict: dict) -> (np.ndarray, np.ndarray, np.ndarray):
+    """
+    :param c_dict: number of crabs at every position
+    :return: every position from the first to the last crab, and the fuel all crabs need to get there
+     when every step costs 1 and when every step costs 1 more than the last
+    """
+    first_position, histogram = crab_histogram(c_dict)
+    positions = np.arange(first_position, first_position + len(histogram))
+    return positions, polynomial_fuel_curve(histogram, [0, 1]), polynomial_fuel_curve(histogram, [0, 1, 1], 2)
+
+
+class FenwickTree:
+    """
+    Binary indexed tree over positions 0 .. size - 1, with point updates and prefix sums in O(log size)
+    """
+
+    def __init__(self, values: list[int]):
+        self.size = len(values)
+        self._tree = [0] + list(values)
+        for i in range(1, self.size + 1):
+            parent = i + (i & -i)
+            if parent <= self.size:
+                self._tree[parent] += self._tree[i]
+
+    def add(self, position: int, delta: int):
+        i = position + 1
+        while i <= self.size:
+            self._tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, end: int) -> int:
+        """
+        :return: sum of the positions 0 .. end - 1
+        """
+        total = 0
+        i = min(end, self.size)
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def lower_bound(self, target: int) -> int:
+        """
+        :return: first position at which the prefix sum reaches target, for non-negative values only
+        """
+        position, total = 0, 0
+        step = 1 << self.size.bit_length()
+        while step:
+            if position + step <= self.size and total + self._tree[position + step] < target:
+                position += step
+                total += self._tree[position]
+            step >>= 1
+        return position
+
+
+class CrabFleet:
+    """
+    Crab positions that change constantly, with the most efficient position for linear fuel (the weighted median)
+    and its fuel available in O(log range) after every change
+    """
+
+    def __init__(self, size: int = 1):
+        """
+        :param size: positions 0 .. size - 1 are expected, the fleet grows when a crab goes beyond
+        """
+        self._histogram = [0] * size
+        self._counts = FenwickTree(self._histogram)
+        self._weighted = FenwickTree(self._histogram)
+        self.no_crabs = 0
+
+    @classmethod
+    def from_counter(cls, c_dict: dict) -> "CrabFleet":
+        if min(c_dict, default=0) < 0:
+            raise ValueError(f"crab positions must not be negative, got {min(c_dict)}")
+        fleet = cls(max(c_dict, default=0) + 1)
+        for position, no_crabs in c_dict.items():
+            fleet._histogram[position] += no_crabs
+        fleet._rebuild(len(fleet._histogram))
+        return fleet
+
+    def _rebuild(self, size: int):
+        self._histogram += [0] * (size - len(self._histogram))
+        self._counts = FenwickTree(self._histogram)
+        self._weighted = FenwickTree([position * count for position, count in enumerate(self._histogram)])
+        self.no_crabs = sum(self._histogram)
+
+    def add(self, position: int, no_crabs: int = 1):
+        if position < 0:
+            raise ValueError(f"crab positions must not be negative, got {position}")
+        if position >= len(self._histogram):
+            self._rebuild(max(2 * len(self._histogram), position + 1))
+        self._histogram[position] += no_crabs
+        self._counts.add(position, no_crabs)
+        self._weighted.add(position, position * no_crabs)
+        self.no_crabs += no_crabs
+
+    def remove(self, position: int, no_crabs: int = 1):
+        if not 0 <= position < len(self._histogram) or self._histogram[position] < no_crabs:
+            raise KeyError(f"there are fewer than {no_crabs} crab(s) at position {position}")
+        self._histogram[position] -= no_crabs
+        self._counts.add(position, -no_crabs)
+        self._weighted.add(position, -position * no_crabs)
+        self.no_crabs -= no_crabs
+
+    def move(self, old_position: int, new_position: int, no_crabs: int = 1):
+        self.remove(old_position, no_crabs)
+        self.add(new_position, no_crabs)
+
+    def fuel(self, x: int) -> int:
+        """
+        :return: fuel all crabs need to get to point x when every step costs 1
+        """
+        crabs_le, weighted_le = self._counts.prefix_sum(x + 1), self._weighted.prefix_sum(x + 1)
+        weighted_gt = self._weighted.prefix_sum(len(self._histogram)) - weighted_le
+        return x * crabs_le - weighted_le + weighted_gt - x * (self.no_crabs - crabs_le)
+
+    def best_position(self) -> int:
+        """
+        :return: most efficient position when every step costs 1, the median of all crabs
+        """
+        if not self.no_crabs:
+            raise ValueError("there are no crabs in the fleet")
+        return self._counts.lower_bound((self.no_crabs + 1) // 2)
+
+    def min_fuel(self) -> (int, int):
+        """
+        :return: most efficient position and the fuel all crabs need to get there when every step costs 1
+        """
+        x = self.best_position()
+        return x, self.fuel(x)
+
+
 @timer_func
 def part_1() -> int:
     """
     :return:   Least amount of fuel crabs need to get to the most efficient point
     """
     logging.info("Calculating the best position for the crabs")
-    c_dict = dict(count_crabs("puzzle_input.txt"))
-
-    # function to calculate distance of all crabs to point x
-    def dist(x): return sum([abs(i - x) * j for i, j in c_dict.items()])
-
-    min_fuel = round(minimize_scalar(dist).fun)
+    x, min_fuel = min_fuel_linear(count_crabs("puzzle_input.txt"))
+    logging.info(f"The best position is {x}")
 
     return min_fuel
 
@@ -54,15 +273,9 @@ def part_2() -> int:
     """
     :return:   Least amount of fuel crabs need to get to the most efficient point
     """
-
     logging.info("Calculating the best position for the crabs")
-    c_dict = dict(count_crabs("puzzle_input.txt"))
-
-    # function to calculate fuel consumption of all crabs to point x
-    def dist(x: int): return sum([(abs(i - x)+1)*abs(i - x)/2 * j for i, j in c_dict.items()])
-
-    x = round(minimize_scalar(dist).x)
-    min_fuel = dist(x)
+    x, min_fuel = min_fuel_triangular(count_crabs("puzzle_input.txt"))
+    logging.info(f"The best position is {x}")
 
     return min_fuel
 
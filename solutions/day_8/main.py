@@ -2,6 +2,9 @@ from time import monotonic_ns
 import logging
 import sys
 from itertools import chain
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 
 logging.basicConfig(
     level=logging.DEBUG,
@@ -31,69 +34,303 @@ def read_input(puzzle_file: str) -> list:
         logging.info("Loaded the input")
         return puzzle_input
 
-def identify_number_codes(number_codes: list[str]) -> list[set]:
+def pattern_mask(pattern: str | set) -> int:
+    """
+    :return: the pattern as a 7-bit integer, bit 0 standing for segment a
+    """
+    return sum(1 << ord(segment) - ord("a") for segment in pattern)
+
+
+def signatures(masks: list[int]) -> list[int]:
+    """
+    :param masks: the ten patterns of a display as 7-bit integers
+    :return: sum of the frequencies of its segments in all ten patterns for every pattern, which does not
+     depend on the wiring of the display
+    """
+    frequency = [sum(mask >> bit & 1 for mask in masks) for bit in range(7)]
+    return [sum(frequency[bit] for bit in range(7) if mask >> bit & 1) for mask in masks]
+
+
+DIGIT_PATTERNS = ["abcefg", "cf", "acdeg", "acdfg", "bcdf", "abdfg", "abdefg", "acf", "abcdefg", "abcdfg"]
+SIGNATURE_TO_DIGIT = {signature: digit for digit, signature in
+                      enumerate(signatures([pattern_mask(i) for i in DIGIT_PATTERNS]))}
+
+
+def decode_wiring(number_codes: list[str]) -> dict[int, int]:
     """
     :param number_codes: list of unidentified number codes for the seven-segment display
-    :return: identified output code
+    :return: digit of every number code, keyed by the code as a 7-bit integer
     """
+    masks = [pattern_mask(i) for i in number_codes]
+    return {mask: SIGNATURE_TO_DIGIT[signature] for mask, signature in zip(masks, signatures(masks))}
 
-    # convert string input to sets in preparation for operations
-    number_codes = [set(i) for i in number_codes]
-    number_segments = [set()] * 10
 
-    # deduce 1,4,7,8 through length
-    for i in number_codes:
-        if len(i) == 2:
-            number_segments[1] = i
-        elif len(i) == 3:
-            number_segments[7] = i
-        elif len(i) == 4:
-            number_segments[4] = i
-        elif len(i) == 7:
-            number_segments[8] = i
-
-    # separate segments from number combinations
-    top = number_segments[7] - number_segments[1]
-    right = number_segments[1]
-    top_left_middle = number_segments[4] - number_segments[1]
-    bottom_left_bottom = number_segments[8] - number_segments[4] - top
-
-    # identify leftover segments via deduction
-    x_len6 = [i for i in number_codes if len(i) == 6]
-    for i in x_len6:
-        t = i.intersection(number_segments[1])
-        z = i - number_segments[4]
-        if len(t) == 1:
-            bottom_right = t
-            number_segments[6] = i
-            top_right = right - bottom_right
-        elif len(z) == 2:
-            bottom = z - top
-            number_segments[9] = i
-            bottom_left = bottom_left_bottom - bottom
-        else:
-            middle = number_segments[8] - i
-            number_segments[0] = i
-            top_left = top_left_middle - middle
-
-    # set the rest of numbers
-    number_segments[2] = number_segments[2].union(top, top_right, middle, bottom_left, bottom)
-    number_segments[3] = number_segments[3].union(top, top_right, middle, bottom_right, bottom)
-    number_segments[5] = number_segments[5].union(top, top_left, middle, bottom_right, bottom)
+def decode_output(mask_to_digit: dict[int, int], output: list[str]) -> int:
+    """
+    :param mask_to_digit: digit of every number code, keyed by the code as a 7-bit integer
+    :param output: the four output codes
+    :return: value shown by the output codes
+    """
+    output_identified = 0
+    for code in output:
+        mask = pattern_mask(code)
+        if mask not in mask_to_digit:
+            raise ValueError(f"output code {code} matches no digit")
+        output_identified = 10 * output_identified + mask_to_digit[mask]
+    return output_identified
 
+
+def identify_number_codes(number_codes: list[str]) -> list[set]:
+    """
+    :param number_codes: list of unidentified number codes for the seven-segment display
+    :return: identified output code
+    """
+    number_segments = [set()] * 10
+    for code, signature in zip(number_codes, signatures([pattern_mask(i) for i in number_codes])):
+        number_segments[SIGNATURE_TO_DIGIT[signature]] = set(code)
     return number_segments
 
 
 def identify_output(number_segments: list[set], output: list[str]) -> int:
-    io_set = [0]*4
-    output_sets = [set(i) for i in output]
-    for l, m in zip(output_sets, range(4)):
-        for i, j in zip(number_segments, range(10)):
-            if l == i:
-                io_set[m] = j
-    output_identified = int("".join([str(i) for i in io_set]))
+    mask_to_digit = {pattern_mask(i): digit for digit, i in enumerate(number_segments)}
+    output_identified = 0
+    for code in output:
+        # unlike decode_output, unknown output codes count as 0
+        output_identified = 10 * output_identified + mask_to_digit.get(pattern_mask(code), 0)
     return output_identified
 
+
+def decode_entry(number_codes: list[str], output: list[str]) -> int:
+    """
+    :param number_codes: list of unidentified number codes for the seven-segment display
+    :param output: the four output codes
+    :return: value shown by the output codes
+    """
+    return decode_output(decode_wiring(number_codes), output)
+
+
+# digit of every signature, -1 where there is none; seven segments lit in all ten patterns give at most 70
+SIGNATURE_TABLE = np.full(71, -1, dtype=np.int64)
+SIGNATURE_TABLE[list(SIGNATURE_TO_DIGIT)] = list(SIGNATURE_TO_DIGIT.values())
+POPCOUNT = np.array([bin(i).count("1") for i in range(128)], dtype=np.uint8)
+
+
+def parse_entries(entries: str | bytes) -> np.ndarray:
+    """
+    :param entries: one entry per line, ten number codes, "|" and four output codes; an entry may continue
+     on the next line after the "|"
+    :return: all codes as 7-bit integers with shape (no. of entries, 14)
+    """
+    characters = np.frombuffer(entries.encode() if isinstance(entries, str) else entries, dtype=np.uint8)
+    is_segment = (characters >= ord("a")) & (characters <= ord("g"))
+
+    # a code starts at every segment letter that does not follow another one
+    code_start = is_segment.copy()
+    code_start[1:] &= ~is_segment[:-1]
+    segments = characters[is_segment] - ord("a")
+    masks = np.bitwise_or.reduceat(np.left_shift(1, segments).astype(np.uint8),
+                                   np.flatnonzero(code_start[is_segment]))
+
+    # an entry ends at every line break that does not directly follow the "|"
+    newlines = np.flatnonzero(characters == ord("\n"))
+    before_newline = newlines - 1
+    blank = before_newline >= 0
+    while np.any(blank):
+        # step back over spaces and carriage returns, but not into the previous line
+        previous = characters[before_newline[blank]]
+        blank[blank] = (previous <= ord(" ")) & (previous != ord("\n"))
+        before_newline[blank] -= 1
+        blank &= before_newline >= 0
+    continued = (before_newline >= 0) & (characters[before_newline] == ord("|"))
+    entry_ends = newlines[~continued]
+
+    code_positions = np.flatnonzero(code_start)
+    no_codes = np.diff(np.searchsorted(code_positions, np.concatenate(([0], entry_ends, [len(characters)]))))
+    malformed = np.flatnonzero((no_codes != 14) & (no_codes != 0))
+    if len(malformed):
+        # the line of the first code of every malformed entry
+        lines = np.searchsorted(newlines, code_positions[np.cumsum(no_codes)[malformed] - no_codes[malformed]]) + 1
+        raise ValueError(f"{len(lines)} entries do not have 14 codes, starting on lines {lines[:10].tolist()}")
+    return masks.reshape(-1, 14)
+
+
+def decode_entries(masks: np.ndarray) -> (int, np.ndarray):
+    """
+    :param masks: codes of all entries as 7-bit integers with shape (no. of entries, 14)
+    :return: number of 1,4,7,8 digits in the output and the output value of every entry
+    """
+    # signatures stay below 71, so all arithmetic fits into uint8
+    signatures_all = np.zeros(masks.shape, dtype=np.uint8)
+    for bit in range(7):
+        has_segment = (masks >> bit) & 1
+        frequency = has_segment[:, :10].sum(axis=1, dtype=np.uint8)
+        signatures_all += has_segment * frequency[:, None]
+    digits = SIGNATURE_TABLE[signatures_all[:, 10:]]
+    if np.any(digits == -1):
+        raise ValueError(f"output codes of entries {np.flatnonzero((digits == -1).any(axis=1)).tolist()} "
+                         f"match no digit")
+    outputs = digits @ np.array([1000, 100, 10, 1])
+
+    no_digits = int(np.isin(POPCOUNT[masks[:, 10:]], [2, 3, 4, 7]).sum())
+    return no_digits, outputs
+
+
+def split_on_lines(puzzle_file: str, no_chunks: int) -> list[tuple[int, int]]:
+    """
+    :param puzzle_file: file with one entry per line
+    :param no_chunks: number of byte ranges the file should be split into
+    :return: list of (start, end) byte offsets, every range starting at the beginning of a line
+    """
+    size = os.path.getsize(puzzle_file)
+    boundaries = [0]
+    with open(puzzle_file, "rb") as f:
+        for i in range(1, no_chunks):
+            # move the border forward to the start of the next line
+            f.seek(max(i * size // no_chunks - 1, boundaries[-1]))
+            f.readline()
+            if boundaries[-1] < f.tell() < size:
+                boundaries.append(f.tell())
+    boundaries.append(size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def _decode_range(puzzle_file: str, start: int, end: int) -> (int, int):
+    """
+    :return: number of 1,4,7,8 digits in the output and sum of all output values of the entries in the byte range
+    """
+    with open(puzzle_file, "rb") as f:
+        f.seek(start)
+        no_digits, outputs = decode_entries(parse_entries(f.read(end - start)))
+    return no_digits, int(outputs.sum())
+
+
+def decode_file_parallel(puzzle_file: str, processes: int | None = None, chunk_size: int = 2**24) -> (int, int):
+    """
+    :param puzzle_file: file with one entry per line
+    :param processes: number of worker processes, defaults to the number of cores
+    :param chunk_size: approximate number of bytes decoded at once by a worker
+    :return: number of 1,4,7,8 digits in the output and sum of all output values
+    """
+    ranges = split_on_lines(puzzle_file, -(-os.path.getsize(puzzle_file) // chunk_size))
+    no_digits = sum_outputs = 0
+    with ProcessPoolExecutor(processes or os.cpu_count()) as executor:
+        for range_digits, range_sum in executor.map(_decode_range, [puzzle_file] * len(ranges), *zip(*ranges)):
+            no_digits += range_digits
+            sum_outputs += range_sum
+    logging.info(f"Decoded {puzzle_file}: {no_digits} 1,4,7,8 digits, output sum {sum_outputs}")
+    return no_digits, sum_outputs
+
+
+class SegmentDecoder:
+    """
+    Solves the wiring of scrambled segment displays with any alphabet (7, 14, 16 segments, ...) by constraint
+    propagation. Solved wirings are memoized by the canonical signature of their patterns, so a repeated
+    scramble is answered from the cache. If a rewiring can swap symbols of the alphabet, the first fitting
+    wiring is returned.
+    """
+
+    def __init__(self, alphabet: dict[str, str]):
+        """
+        :param alphabet: segments lit for every symbol of the display, e.g. {"1": "cf", "7": "acf", ...}
+        """
+        self.symbols = {frozenset(segments): symbol for symbol, segments in alphabet.items()}
+        self.segments = sorted(set().union(*self.symbols))
+        self._segment_profiles = {segment: self._profile(segment, self.symbols) for segment in self.segments}
+        self._cache = {}
+        self.cache_hits = 0
+
+    @staticmethod
+    def _profile(segment: str, patterns) -> tuple:
+        """
+        :return: sizes of the patterns the segment is part of, which any wiring has to keep
+        """
+        return tuple(sorted(len(pattern) for pattern in patterns if segment in pattern))
+
+    def solve(self, patterns: list[str]) -> dict[str, str]:
+        """
+        :param patterns: scrambled patterns of all symbols of the alphabet, in any order
+        :return: segment of every wire
+        """
+        signature = tuple(sorted("".join(sorted(pattern)) for pattern in patterns))
+        if signature in self._cache:
+            self.cache_hits += 1
+            return self._cache[signature]
+
+        patterns = [frozenset(pattern) for pattern in signature]
+        wires = sorted(set().union(*patterns))
+        if len(wires) != len(self.segments) or len(patterns) != len(self.symbols):
+            raise ValueError(f"{len(patterns)} patterns of {len(wires)} wires do not fit the alphabet "
+                             f"of {len(self.symbols)} symbols with {len(self.segments)} segments")
+
+        candidates = {wire: {segment for segment in self.segments
+                             if self._segment_profiles[segment] == self._profile(wire, patterns)} for wire in wires}
+        wiring = self._search(patterns, candidates)
+        if wiring is None:
+            raise ValueError(f"no wiring of the alphabet fits the patterns {list(signature)}")
+
+        self._cache[signature] = wiring
+        return wiring
+
+    def _propagate(self, patterns: list[frozenset], candidates: dict[str, set]) -> bool:
+        """
+        :return: False if the candidates contradict each other, they are narrowed down in place otherwise
+        """
+        changed = True
+        while changed:
+            changed = False
+            for pattern in patterns:
+                # symbols the pattern can still stand for, and the segments its wires and the other wires can take
+                symbols = [segments for segments in self.symbols if len(segments) == len(pattern)
+                           and all(candidates[wire] & segments for wire in pattern)]
+                inside = set().union(*symbols)
+                outside = set().union(*(set(self.segments) - segments for segments in symbols))
+                for wire, allowed in candidates.items():
+                    narrowed = allowed & (inside if wire in pattern else outside)
+                    if narrowed != allowed:
+                        candidates[wire] = narrowed
+                        changed = True
+            # a segment taken for sure by one wire cannot be taken by any other
+            for wire, allowed in candidates.items():
+                if len(allowed) == 1:
+                    for other, other_allowed in candidates.items():
+                        if other != wire and allowed <= other_allowed:
+                            candidates[other] = other_allowed - allowed
+                            changed = True
+            if not all(candidates.values()):
+                return False
+        return True
+
+    def _search(self, patterns: list[frozenset], candidates: dict[str, set]) -> dict[str, str] | None:
+        if not self._propagate(patterns, candidates):
+            return None
+        if all(len(allowed) == 1 for allowed in candidates.values()):
+            wiring = {wire: next(iter(allowed)) for wire, allowed in candidates.items()}
+            decoded = {frozenset(wiring[wire] for wire in pattern) for pattern in patterns}
+            return wiring if decoded == set(self.symbols) else None
+
+        # guess the wire with the fewest candidates left
+        wire = min((wire for wire in candidates if len(candidates[wire]) > 1), key=lambda i: len(candidates[i]))
+        for segment in sorted(candidates[wire]):
+            guess = {other: set(allowed) for other, allowed in candidates.items()}
+            guess[wire] = {segment}
+            wiring = self._search(patterns, guess)
+            if wiring is not None:
+                return wiring
+        return None
+
+    def decode(self, patterns: list[str], output: list[str]) -> list[str]:
+        """
+        :param patterns: scrambled patterns of all symbols of the alphabet, in any order
+        :param output: scrambled output codes
+        :return: symbol of every output code
+        """
+        wiring = self.solve(patterns)
+        return [self.symbols[frozenset(wiring[wire] for wire in code)] for code in output]
+
+
+SEVEN_SEGMENT = {str(digit): pattern for digit, pattern in enumerate(DIGIT_PATTERNS)}
+
+
 @timer_func
 def part_1() -> int:
     """
@@ -120,7 +357,7 @@ def part_2() -> int:
 
     identified_outputs = []
     for i, j in zip(range(0,len(number_codes_all),10),range(0,len(output_all),4)):
-        identified_outputs.append(identify_output(identify_number_codes(number_codes_all[i:i+10]), output_all[j:j+4]))
+        identified_outputs.append(decode_entry(number_codes_all[i:i+10], output_all[j:j+4]))
 
     sum_outputs = sum(identified_outputs)
     logging.info(f"The sum of all output values is {sum_outputs}")
@@ -0,0 +1,31 @@
+"""
+Day 1 Tests
+"""
+import numpy as np
+from solutions.day_1.main import count_increases, count_increases_streaming, count_increases_parallel
+
+sonar_sweep = "tests/day_1/sonar_sweep.txt"
+
+
+def test_count_increases():
+    """
+    Tests the count_increases function
+    """
+    depths = np.array([199, 200, 208, 210, 200, 207, 240, 269, 260, 263])
+    assert count_increases(depths, [1, 3, 10]) == {1: 7, 3: 5, 10: 0}
+
+
+def test_count_increases_streaming():
+    """
+    Tests the count_increases_streaming function with chunks smaller than a line and larger than the file
+    """
+    for chunk_size in [1, 4, 2**20]:
+        assert count_increases_streaming(sonar_sweep, [1, 3], chunk_size) == {1: 7, 3: 5}
+
+
+def test_count_increases_parallel():
+    """
+    Tests the count_increases_parallel function with ranges shorter than the largest window
+    """
+    for no_chunks in [1, 3, 10]:
+        assert count_increases_parallel(sonar_sweep, [1, 3], 2, no_chunks) == {1: 7, 3: 5}
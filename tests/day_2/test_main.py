@@ -0,0 +1,83 @@
+"""
+Day 2 Tests
+"""
+from solutions.day_2.main import parse_commands, course_without_aim, course_with_aim, compose_courses, \
+    course_parallel, SubmarineTracker
+
+course = "tests/day_2/course.txt"
+commands = parse_commands("forward 5\ndown 5\nforward 8\nup 3\ndown 8\nforward 2\n")
+
+
+def test_course_without_aim():
+    """
+    Tests the course_without_aim function
+    """
+    assert course_without_aim(*commands) == (15, 10)
+
+
+def test_course_with_aim():
+    """
+    Tests the course_with_aim function, including amounts with more than one digit
+    """
+    assert course_with_aim(*commands) == (15, 60)
+    assert course_with_aim(*parse_commands("down 12\nforward 10\n")) == (10, 120)
+
+
+def test_course_with_aim_large_amounts():
+    """
+    Tests that course_with_aim and course_without_aim do not overflow int64 for large amounts
+    """
+    large = parse_commands("down 4000000000\nforward 4000000000\nforward 4000000000\n")
+    assert course_with_aim(*large) == (8000000000, 32000000000000000000)
+    many = parse_commands("down 9223372036854775807\ndown 9223372036854775807\nforward 1\n")
+    assert course_without_aim(*many) == (1, 2 * 9223372036854775807)
+    assert course_with_aim(*many) == (1, 2 * 9223372036854775807)
+
+
+def test_compose_courses():
+    """
+    Tests that composing the courses of two blocks of commands gives the course of all commands
+    """
+    first = parse_commands("forward 5\ndown 5\nforward 8\n")
+    second = parse_commands("up 3\ndown 8\nforward 2\n")
+    # both blocks end with an aim of 5
+    assert compose_courses((*course_with_aim(*first), 5), (*course_with_aim(*second), 5)) == (15, 60, 10)
+
+
+def test_course_parallel():
+    """
+    Tests the course_parallel function with more ranges than lines
+    """
+    for no_chunks, no_checkpoints in [(1, 1), (3, 3), (10, 6)]:
+        checkpoints = course_parallel(course, 2, no_chunks)
+        assert len(checkpoints) == no_checkpoints
+        assert checkpoints[-1] == (6, 15, 60, 10)
+    assert course_parallel(course, 2, 3) == [(2, 5, 0, 5), (4, 13, 40, 2), (6, 15, 60, 10)]
+
+
+def test_submarine_tracker():
+    """
+    Tests the SubmarineTracker with single commands and batches
+    """
+    tracker = SubmarineTracker()
+    tracker.push("forward 5")
+    tracker.push("down 5")
+    assert (tracker.horizontal, tracker.depth, tracker.aim) == (5, 0, 5)
+    tracker.push_many(["forward 8", "up 3", "down 8"])
+    tracker.push_many("forward 2\n")
+    assert (tracker.horizontal, tracker.depth, tracker.aim) == (15, 60, 10)
+    assert tracker.product_without_aim == 150
+    assert tracker.product == 900
+
+
+def test_submarine_tracker_large_amounts():
+    """
+    Tests that a batch of large amounts gives the same position as pushing the commands one by one
+    """
+    commands = ["down 4000000000", "forward 4000000000", "up 1", "forward 4000000000"]
+    single, batch = SubmarineTracker(), SubmarineTracker()
+    for command in commands:
+        single.push(command)
+    batch.push_many(commands)
+    assert batch == single
+    assert batch.depth == 31999999996000000000
@@ -0,0 +1,64 @@
+"""
+Day 3 Tests
+"""
+import numpy as np
+import pytest
+from solutions.day_3.main import parse_report, read_report, column_counts, gamma_epsilon_rates, \
+    life_support_ratings, DiagnosticIndex
+
+values, width = read_report("tests/day_3/diagnostic_report.txt")
+
+
+def test_read_report():
+    """
+    Tests the read_report function
+    """
+    assert width == 5
+    assert values[:3].tolist() == [4, 30, 22]
+    assert parse_report("1" * 64 + "\n" + "0" * 63 + "1\n")[0].tolist() == [2**64 - 1, 1]
+    with pytest.raises(ValueError):
+        parse_report("1" * 65 + "\n" + "0" * 65 + "\n")
+
+
+def test_column_counts():
+    """
+    Tests the column_counts function, including numbers wider than 32 bits
+    """
+    assert column_counts(values, width).tolist() == [7, 5, 8, 7, 5]
+    wide = np.array([2**63 + 1, 2**40], dtype=np.uint64)
+    assert column_counts(wide, 64)[[0, 23, 63]].tolist() == [1, 1, 1]
+
+
+def test_gamma_epsilon_rates():
+    """
+    Tests the gamma_epsilon_rates function
+    """
+    assert gamma_epsilon_rates(values, width) == (22, 9)
+
+
+def test_life_support_ratings():
+    """
+    Tests the life_support_ratings function
+    """
+    assert life_support_ratings(values, width) == (23, 10)
+
+
+def test_diagnostic_index():
+    """
+    Tests the DiagnosticIndex while rows are inserted and removed
+    """
+    index = DiagnosticIndex(width)
+    index.insert_many(values)
+    assert index.gamma_epsilon_rates() == (22, 9)
+    assert index.life_support_ratings() == (23, 10)
+
+    index.insert("11111", 5)
+    assert index.life_support_ratings() == (31, 10)
+    index.remove(0b11111, 5)
+    assert len(index) == 12
+    assert index.gamma_epsilon_rates() == (22, 9)
+
+    for row in ["1111111", "111", 0b1000000, -1]:
+        with pytest.raises(ValueError):
+            index.insert(row)
+    assert len(index) == 12
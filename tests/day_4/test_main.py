@@ -0,0 +1,40 @@
+"""
+Day 4 Tests
+"""
+from solutions.day_4.main import read_bingo, play_bingo, BingoServer, rank_bingo_cards
+
+numbers_drawn, bingo_cards_all = read_bingo("tests/day_4/bingo.txt")
+
+
+def test_play_bingo():
+    """
+    Tests the play_bingo function
+    """
+    win_order, win_turns, scores = play_bingo(numbers_drawn, bingo_cards_all)
+    assert win_order.tolist() == [2, 0, 1]
+    assert win_turns.tolist() == [13, 14, 11]
+    assert scores[2] == 4512
+    assert scores[1] == 1924
+
+
+def test_bingo_server():
+    """
+    Tests that the BingoServer reports winners as soon as their number is drawn
+    """
+    server = BingoServer(bingo_cards_all)
+    for number in numbers_drawn[:11]:
+        assert server.draw(number) == []
+    assert server.draw(numbers_drawn[11]) == [(2, 4512)]
+    for number in numbers_drawn[12:]:
+        server.draw(number)
+    assert server.winners == [(2, 24, 4512), (0, 16, 2192), (1, 13, 1924)]
+
+
+def test_rank_bingo_cards():
+    """
+    Tests the rank_bingo_cards function with chunks splitting the cards
+    """
+    for chunk_cards in [1, 2, 10]:
+        earliest, latest = rank_bingo_cards("tests/day_4/bingo.txt", 2, chunk_cards)
+        assert earliest == [(2, 11, 4512), (0, 13, 2192)]
+        assert latest == [(1, 14, 1924), (0, 13, 2192)]
@@ -0,0 +1,58 @@
+"""
+Day 5 Tests
+"""
+import numpy as np
+from solutions.day_5.main import read_vent_array, count_overlaps, count_overlaps_sweep, \
+    count_overlaps_parallel, VentHeatmap
+
+v_all = read_vent_array("tests/day_5/vents.txt")
+
+
+def test_count_overlaps():
+    """
+    Tests the count_overlaps function on a dense and on a sparse grid
+    """
+    assert count_overlaps(v_all) == (5, 12)
+    far_apart = np.array([[0, 0, 0, 3], [0, 2, 3, 2], [10**8, 0, 10**8, 3], [10**8, 1, 10**8, 1]])
+    assert count_overlaps(far_apart) == (2, 2)
+
+
+def test_count_overlaps_sweep():
+    """
+    Tests the count_overlaps_sweep function, including coordinates far too large for a grid
+    """
+    assert count_overlaps_sweep(v_all) == (5, 12)
+    # two overlapping horizontal vents crossing two overlapping diagonal vents in their shared part
+    crossing_overlaps = np.array([[0, 5, 10, 5], [3, 5, 12, 5], [0, 0, 10, 10], [2, 2, 8, 8]])
+    assert count_overlaps_sweep(crossing_overlaps) == count_overlaps(crossing_overlaps) == (8, 14)
+    assert count_overlaps_sweep(v_all + 10**9) == (5, 12)
+    long_overlap = np.array([[0, 0, 10**9, 0], [5 * 10**8, 0, 15 * 10**8, 0], [7, -7, 7, 7]])
+    assert count_overlaps_sweep(long_overlap) == (5 * 10**8 + 2, 5 * 10**8 + 2)
+
+
+def test_count_overlaps_parallel():
+    """
+    Tests the count_overlaps_parallel function with tiles cutting through the vents
+    """
+    for no_tiles in [1, 3, 10]:
+        assert count_overlaps_parallel(v_all, 2, no_tiles) == 12
+
+
+def test_vent_heatmap(tmp_path):
+    """
+    Tests rectangle queries on the VentHeatmap while vents are added and after saving and loading it
+    """
+    heatmap = VentHeatmap.from_vents(v_all[:5])
+    assert heatmap.count_dangerous(0, 0, 9, 9) == 3
+    heatmap.add_vents(v_all[5:])
+    assert heatmap.count_dangerous(0, 0, 9, 9) == 12
+    assert heatmap.count_dangerous(0, 0, 4, 4) == 3
+    assert heatmap.count_dangerous(20, 20, 30, 30) == 0
+
+    # a vent left of the grid grows it, its cells at x < 0 are covered only once
+    heatmap.add_vents(np.array([[-5, 9, 1, 9]]))
+    assert heatmap.origin == (-5, 0)
+    assert heatmap.count_dangerous(-10, 9, 10, 9) == 3
+
+    heatmap.save(tmp_path / "heatmap.npz")
+    assert VentHeatmap.load(tmp_path / "heatmap.npz").count_dangerous(-10, 0, 10, 9) == 12
@@ -0,0 +1,63 @@
+"""
+Day 6 Tests
+"""
+from collections import Counter
+import numpy as np
+import pytest
+from solutions.day_6.main import population_after, population_table, Lanternfish, LanternfishSwarm, \
+    LanternfishArraySwarm
+
+ages = Counter([3, 4, 3, 1, 2])
+
+
+def test_population_after():
+    """
+    Tests the population_after function for exact and modular results
+    """
+    assert population_after(ages, 0) == 5
+    assert population_after(ages, 18) == 26
+    assert population_after(ages, 80) == 5934
+    assert population_after([0, 1, 1, 2, 1, 0, 0, 0, 0], 256) == 26984457539
+    assert population_after(np.array([0, 1, 1, 2, 1, 0, 0, 0, 0]), 256) == 26984457539
+    assert population_after((0, 1, 1, 2, 1, 0, 0, 0, 0), 256, 1000) == 539
+    assert population_after(ages, 256, 1000) == 539
+
+
+def test_population_table():
+    """
+    Tests the population_table function for several populations and horizons at once
+    """
+    table = population_table([[0, 1, 1, 2, 1, 0, 0, 0, 0], [5, 0, 0, 0, 0, 0, 0, 0, 0]], [0, 18, 80, 256])
+    assert table.tolist() == [[5, 26, 5934, 26984457539],
+                              [5, population_after([5] + [0] * 8, 18), population_after([5] + [0] * 8, 80),
+                               population_after([5] + [0] * 8, 256)]]
+    assert population_table([[0, 1, 1, 2, 1, 0, 0, 0, 0]], [256], 1000).tolist() == [[539]]
+
+
+def test_lanternfish_array_swarm():
+    """
+    Tests that the LanternfishArraySwarm ages every fish like the LanternfishSwarm
+    """
+    array_swarm = LanternfishArraySwarm([3, 4, 3, 1, 2], track_parents=True)
+    swarm = LanternfishSwarm([Lanternfish(i) for i in [3, 4, 3, 1, 2]])
+    for day in range(18):
+        array_swarm.pass_day()
+        swarm.pass_day()
+        assert array_swarm.timers.tolist() == [fish.age for fish in swarm.swarm]
+    assert len(array_swarm) == 26
+    assert array_swarm.parents[:8].tolist() == [-1, -1, -1, -1, -1, 3, 4, 0]
+
+    with pytest.raises(MemoryError):
+        small_swarm = LanternfishArraySwarm([3, 4, 3, 1, 2], max_bytes=100)
+        for day in range(80):
+            small_swarm.pass_day()
+
+    # the swarm is left untouched when the newborn do not fit into the budget
+    full_swarm = LanternfishArraySwarm([0] * 10, max_bytes=12)
+    with pytest.raises(MemoryError):
+        full_swarm.pass_day()
+    assert full_swarm.timers.tolist() == [0] * 10
+
+    empty_swarm = LanternfishArraySwarm([], track_parents=True)
+    empty_swarm.pass_day()
+    assert len(empty_swarm) == 0
@@ -0,0 +1,61 @@
+"""
+Day 7 Tests
+"""
+from collections import Counter
+import pytest
+from solutions.day_7.main import min_fuel_linear, min_fuel_triangular, fuel_curves, crab_histogram, \
+    polynomial_fuel_curve, CrabFleet
+
+c_dict = Counter([16, 1, 2, 0, 4, 2, 7, 1, 2, 14])
+
+
+def test_min_fuel_linear():
+    """
+    Tests the min_fuel_linear function
+    """
+    assert min_fuel_linear(c_dict) == (2, 37)
+
+
+def test_min_fuel_triangular():
+    """
+    Tests the min_fuel_triangular function
+    """
+    assert min_fuel_triangular(c_dict) == (5, 168)
+
+
+def test_fuel_curves():
+    """
+    Tests the fuel_curves function against the fuel at the best positions
+    """
+    positions, linear, triangular = fuel_curves(c_dict)
+    assert positions[0] == 0 and positions[-1] == 16
+    assert linear[2] == 37 and linear[1] == 41 and linear[3] == 39 and linear[10] == 71
+    assert triangular[5] == 168 and triangular[2] == 206
+    assert linear.min() == 37 and triangular.min() == 168
+
+
+def test_polynomial_fuel_curve():
+    """
+    Tests the polynomial_fuel_curve function with a cost that has a constant and a cubic term
+    """
+    first_position, histogram = crab_histogram({3: 2, 5: 1})
+    assert first_position == 3
+    assert polynomial_fuel_curve(histogram, [1, 0, 0, 1]).tolist() == [2 + 1 + 8, 2 + 2 + 1 + 1, 2 + 16 + 1]
+
+
+def test_crab_fleet():
+    """
+    Tests the CrabFleet while crabs join, leave and move
+    """
+    fleet = CrabFleet.from_counter(c_dict)
+    assert fleet.min_fuel() == (2, 37)
+    fleet.move(16, 2)
+    assert fleet.min_fuel() == (2, 23)
+    fleet.remove(2, 4)
+    fleet.add(40, 3)
+    assert fleet.no_crabs == 9
+    # crabs at 0, 1, 1, 4, 7, 14, 40, 40, 40
+    assert fleet.min_fuel() == (7, 7 + 6 + 6 + 3 + 0 + 7 + 3 * 33)
+    assert fleet.fuel(4) == 4 + 3 + 3 + 0 + 3 + 10 + 3 * 36
+    with pytest.raises(ValueError):
+        CrabFleet.from_counter({-1: 2, 5: 1})
@@ -1,4 +1,6 @@
-from solutions.day_8.main import identify_number_codes, identify_output
+import pytest
+from solutions.day_8.main import identify_number_codes, identify_output, decode_entry, parse_entries, \
+    decode_entries, decode_file_parallel, SegmentDecoder, SEVEN_SEGMENT
 
 output = ['cdfeb', 'fcadb', 'cdfeb', 'cdbaf']
 output_identified = 5353
@@ -14,3 +16,63 @@ def test_identify_number_codes():
 def test_identify_output():
     assert identify_output(number_codes_identified_sets, output) == output_identified
 
+
+def test_decode_entry():
+    assert decode_entry(number_codes, output) == output_identified
+
+
+def test_invalid_output(tmp_path):
+    invalid_output = output[:3] + ['cdbf']
+    assert identify_output(number_codes_identified_sets, invalid_output) == 5350
+    with pytest.raises(ValueError):
+        decode_entry(number_codes, invalid_output)
+    puzzle_file = tmp_path / "entries.txt"
+    puzzle_file.write_text(" ".join(number_codes) + " | " + " ".join(invalid_output) + "\n")
+    with pytest.raises(ValueError):
+        decode_file_parallel(str(puzzle_file), 1)
+
+
+def test_decode_entries():
+    entries = parse_entries(" ".join(number_codes) + " | " + " ".join(output) + "\n"
+                            + " ".join(number_codes[::-1]) + " |\n" + " ".join(output[::-1]) + "\n")
+    assert entries.shape == (2, 14)
+    no_digits, outputs = decode_entries(entries)
+    assert no_digits == 0
+    assert outputs.tolist() == [5353, 3535]
+    with pytest.raises(ValueError):
+        decode_entries(parse_entries(" ".join(number_codes) + " | cdfeb fcadb cdfeb cdbf\n"))
+    # a line with a code too many must not shift its last code into the next entry
+    with pytest.raises(ValueError, match=r"lines \[1, 2\]"):
+        parse_entries(" ".join(number_codes + ["ab"]) + " | " + " ".join(output) + "\n"
+                      + " ".join(number_codes) + " | " + " ".join(output[:3]) + "\n")
+    with pytest.raises(ValueError):
+        decode_entries(parse_entries(" ".join(["abcdefg"] * 10) + " | abcdefg abcdefg abcdefg abcdefg\n"))
+
+
+def test_decode_file_parallel(tmp_path):
+    entries = [(number_codes, output), (number_codes[::-1], output[::-1]),
+               (number_codes[3:] + number_codes[:3], ['ab', 'dab', 'eafb', 'acedgfb']),
+               (number_codes, ['cdfbe', 'ab', 'cagedb', 'eafb'])]
+    puzzle_file = tmp_path / "entries.txt"
+    puzzle_file.write_text("".join(" ".join(codes) + " | " + " ".join(shown) + "\n" for codes, shown in entries))
+    for chunk_size in [50, 200, 2**24]:
+        assert decode_file_parallel(str(puzzle_file), 2, chunk_size) == \
+               (6, sum(decode_entry(codes, shown) for codes, shown in entries))
+
+
+fourteen_segment = {"0": "abcdefjk", "1": "bcj", "2": "abdegh", "3": "abcdh", "4": "bcfgh", "5": "adfhn",
+                    "6": "acdefgh", "7": "ajm", "8": "abcdefgh", "9": "abcdfgh", "+": "ghil", "-": "gh",
+                    "*": "ghijklmn", "/": "jm", "X": "ijlm", "K": "efgjn"}
+
+
+def test_segment_decoder():
+    decoder = SegmentDecoder(SEVEN_SEGMENT)
+    assert decoder.decode(number_codes, output) == ["5", "3", "5", "3"]
+    assert decoder.decode(number_codes[::-1], output[::-1]) == ["3", "5", "3", "5"]
+    assert decoder.cache_hits == 1
+
+    decoder = SegmentDecoder(fourteen_segment)
+    scramble = str.maketrans("abcdefghijklmn", "kdnmahbijlgecf")
+    patterns = [i.translate(scramble) for i in fourteen_segment.values()][::-1]
+    shown = [fourteen_segment[i].translate(scramble) for i in "X4+K"]
+    assert decoder.decode(patterns, shown) == ["X", "4", "+", "K"]